@@ -15,7 +15,13 @@ __version__ = "0.1.0"
 
 
 
-from .main import run_from_config
+def __getattr__(name):
+    # run_from_config lives next to the plotters, so it is only imported when first used
+    if name == "run_from_config":
+        from .main import run_from_config
+        return run_from_config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['run_from_config']
 
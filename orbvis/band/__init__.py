@@ -12,6 +12,14 @@ Author: Taradutt Pattnaik
 Created: 2025-06-11
 """
 
-from .parser import read_band_energies_and_klist_from_PROCAR, get_tot_index_from_procar,orbvis_orbital_specific_band_data_from_PROCAR, VASPStyleParser
-from .plotter import orbscatter
-__all__ = ["orbscatter","read_band_energies_and_klist_from_PROCAR", "get_tot_index_from_procar","orbvis_orbital_specific_band_data_from_PROCAR", "VASPStyleParser"]
\ No newline at end of file
+from .parser import read_band_energies_and_klist_from_PROCAR, get_tot_index_from_procar,orbvis_orbital_specific_band_data_from_PROCAR, read_bands_and_projections_from_PROCAR, ProcarReader, VASPStyleParser
+
+
+def __getattr__(name):
+    # orbscatter pulls in matplotlib, so it is only imported when first used
+    if name == "orbscatter":
+        from .plotter import orbscatter
+        return orbscatter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["orbscatter","read_band_energies_and_klist_from_PROCAR", "get_tot_index_from_procar","orbvis_orbital_specific_band_data_from_PROCAR", "read_bands_and_projections_from_PROCAR", "ProcarReader", "VASPStyleParser"]
\ No newline at end of file
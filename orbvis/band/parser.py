@@ -8,109 +8,255 @@ Orbital-projected band structure plotting for VASP PROCAR data.
 
 File name:orbvis/band/parser.py
 
+Performance note: PROCAR reading is I/O- and interpreter-bound. The cost is Python work per
+line (iteration, strip/split, float()) and bytes moved, not floating-point arithmetic, so SIMD
+or GPU work does not pay off here. What does: fewer Python operations per line (mmap + find,
+first-byte dispatch), bulk ASCII-to-float conversion (np.fromstring on whole ion tables),
+the numba kernel in parser_numba.py, and reusing parsed results (the .npy cache keyed on
+file path, mtime and size). Profile before changing a reader.
+
 Author: Taradutt Pattnaik
 Created: 2025-06-11
 """
 
 import ast
-import matplotlib.cm as cm
-from matplotlib import colors as mcolors
+import contextlib
+import copy
+import functools
+import hashlib
+import itertools
+import json
+import mmap
+import os
 import numpy as np
 import re
+import shutil
+import tempfile
+import time
+
+from .. import __version__
+from ..colors import normalize_color_str
+from .parser_numba import LAYOUT_ERROR, NUMBA_AVAILABLE, scan_procar_jit
+
+# ORBITAL_INFO entries look like [[0, 1], "Mo", [4, 5]]; element names with quotes or escapes are left to ast
+_ORBITAL_ENTRY_RE = re.compile(r"""\[\s*\[([^\[\]]*)\]\s*,\s*(["'])([^"'\\]*)\2\s*,\s*\[([^\[\]]*)\]\s*\]""")
+_INT_RE = re.compile(r"[-+]?\d+")
+_QUOTED_RE = re.compile(r"""(["'])([^"'\\]*)\1""")
+_COLOR_TOKEN_RE = re.compile(r"#?\w+")
+# Only element type allowed in ORBITAL_INFO index lists
+_INT_TYPE = frozenset({int})
+
+
+def _parse_int_list(text):
+    return [int(x) for x in text.split(',') if x.strip()]
 
 
-from distinctipy import get_colors, get_hex
+def _parse_orbital_info(text):
+    """
+    Parses an ORBITAL_INFO value without building a Python AST.
+    Raises ValueError for anything outside the plain [[ints], "name", [ints]] layout.
+    """
+    text = text.strip()
+    if not (text.startswith('[') and text.endswith(']')):
+        raise ValueError("ORBITAL_INFO is not a bracketed list")
+    inner = text[1:-1]
+    entries = [[_parse_int_list(m.group(1)), m.group(3), _parse_int_list(m.group(4))]
+               for m in _ORBITAL_ENTRY_RE.finditer(inner)]
+    if _ORBITAL_ENTRY_RE.sub('', inner).strip(', \t') != '':
+        raise ValueError("Unexpected text in ORBITAL_INFO")
+    return entries
+
+
+def _parse_color_token(token):
+    token = token.strip()
+    quoted = _QUOTED_RE.fullmatch(token)
+    if quoted:
+        return quoted.group(2)
+    if _COLOR_TOKEN_RE.fullmatch(token):
+        return token
+    raise ValueError(f"Unexpected color token: {token}")
+
+
+def _parse_color_scheme(text):
+    """
+    Parses a COLOR_SCHEME value: an int, a bracketed list of (optionally quoted) colors,
+    or a bare colormap name. Raises ValueError for anything else.
+    """
+    text = text.strip()
+    if _INT_RE.fullmatch(text):
+        return int(text)
+    if text.startswith('[') and text.endswith(']'):
+        inner = text[1:-1].strip().rstrip(',')
+        return [_parse_color_token(token) for token in inner.split(',')] if inner else []
+    return _parse_color_token(text)
+
+
+# Parsed PROCAR arrays are cached here as directories of .npy files, see _procar_cache_path. ORBVIS_CACHE_DIR overrides the location.
+CACHE_DIR = os.environ.get("ORBVIS_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "orbvis")
+# Bump when the layout of the cached arrays changes, so older cache files are ignored
+CACHE_FORMAT = 2
+# The least recently used entries are removed once the cache grows past this size. ORBVIS_CACHE_MAX_MB overrides it.
+CACHE_MAX_BYTES = int(float(os.environ.get("ORBVIS_CACHE_MAX_MB") or 1024) * 2**20)
+# Cache entries are directories named by _procar_cache_path; writes go through "tmp-*" directories,
+# which are only left behind by interrupted writes and are removed once they are this old
+_CACHE_ENTRY_RE = re.compile(r"[0-9a-f]{16}")
+_CACHE_TMP_PREFIX = "tmp-"
+_CACHE_TMP_MAX_AGE = 3600
+
+# Whole-file patterns for the k-point and band headers. Coordinates can run into each other
+# ("0.50000000-0.50000000"), so numbers are matched by shape rather than split on whitespace.
+_FLOAT_PATTERN = rb"[-+]?\d*\.\d+(?:[Ee][-+]?\d+)?"
+KPT_RE = re.compile(rb"k-point\s+\d+\s*:\s*(" + _FLOAT_PATTERN + rb")\s*(" + _FLOAT_PATTERN + rb")\s*("
+                    + _FLOAT_PATTERN + rb")\s+weight\s*=\s*(" + _FLOAT_PATTERN + rb")")
+BAND_RE = re.compile(rb"band\s+\d+\s*#\s*energy\s+(" + _FLOAT_PATTERN + rb")")
+# Numbers of a single k-point header line whose coordinates do not split on whitespace
+_KPT_LINE_NUMBER_RE = re.compile(rb"[-+]?\d*\.\d+|\d+")
 
 class VASPStyleParser:
+    __slots__ = ('filepath', 'params')
+
+    # Values of every key the config file does not set
+    DEFAULTS = {
+        'MODE': 'band',
+        'PROCAR_PATH': None,
+        'DOSCAR_PATH': None,
+        'ISPIN': None,
+        'SOC': False, 
+        'ORBITAL_INFO': None,
+
+        # BAND-only
+        'BS_LINEWIDTH': 1.0,
+        'SCALE': 1.0,
+
+        # DOS-only
+        'TDOS_LINEWIDTH': 1.0,
+        'PDOS_LINEWIDTH': 1.0,
+        'SIGMA': 2.0,
+        'XMIN': None,             # Optional xlim lower limit (for DOS only)
+        'XMAX': None,             # Optional xlim (for DOS only)
+        'SHOW_TDOS': True,         # Whether to show TDOS in PDOS plots
+        # Common
+        'TITLE': 'Orbvis',
+        'EFERMI': None,
+        'COLOR_SCHEME': None,
+        'SAVEAS': 'output.png',
+        'DPI': 300,
+        'YMIN': -5.0,
+        'YMAX': 5.0,
+        'FIGSIZEX': 10,
+        'FIGSIZEY': 6,
+        'TRANSPARENCY': 70,
+        'LEGEND_LOC': None,
+        'PLOT_OPTION': 0  # # 0 = orbital scatterplot; 1 (parametric) is not implemented yet
+    }
+
+    # Value types of the single-line keys, and the keys whose values may span several lines
+    _INT_KEYS = frozenset({'ISPIN', 'DPI'})
+    _FLOAT_KEYS = frozenset({'YMIN', 'YMAX', 'XMIN', 'XMAX', 'FIGSIZEX', 'FIGSIZEY', 'TRANSPARENCY', 'EFERMI',
+                             'SCALE', 'BS_LINEWIDTH', 'TDOS_LINEWIDTH', 'PDOS_LINEWIDTH', 'SIGMA'})
+    _BUFFERED_KEYS = frozenset({'ORBITAL_INFO', 'COLOR_SCHEME'})
+
     def __init__(self, filepath):
-        self.filepath = filepath
-        self.params = {
-            'MODE': 'band',
-            'PROCAR_PATH': None,
-            'DOSCAR_PATH': None,
-            'ISPIN': None,
-            'SOC': False, 
-            'ORBITAL_INFO': None,
-
-            # BAND-only
-            'BS_LINEWIDTH': 1.0,
-            'SCALE': 1.0,
-
-            # DOS-only
-            'TDOS_LINEWIDTH': 1.0,
-            'PDOS_LINEWIDTH': 1.0,
-            'SIGMA': 2.0,
-            'XMIN': None,             # Optional xlim lower limit (for DOS only)
-            'XMAX': None,             # Optional xlim (for DOS only)
-            'SHOW_TDOS': True,         # Whether to show TDOS in PDOS plots
-            # Common
-            'TITLE': 'Orbvis',
-            'EFERMI': None,
-            'COLOR_SCHEME': None,
-            'SAVEAS': 'output.png',
-            'DPI': 300,
-            'YMIN': -5.0,
-            'YMAX': 5.0,
-            'FIGSIZEX': 10,
-            'FIGSIZEY': 6,
-            'TRANSPARENCY': 70,
-            'LEGEND_LOC': None,
-            'PLOT_OPTION': 0  # # 0 = orbital scatterplot; 1 (parametric) is not implemented yet
-        }
-
-        self._parse()
+        # Accepts str or any os.PathLike; normalized once so the cache key and the open use the same path
+        self.filepath = os.fspath(filepath)
+        abspath = os.path.abspath(self.filepath)
+        # Parsing is memoized per file version; the copy keeps callers' edits out of the cache
+        st = os.stat(abspath)
+        self.params = copy.deepcopy(_parse_config_cached(abspath, st.st_mtime_ns, st.st_size))
         self._apply_defaults()
         self._validate()
-
-    def _parse(self):
-        with open(self.filepath, 'r') as f:
-            lines = f.readlines()
-
-        buffer = ""
-        parsing_key = None
-        bracket_balance = 0
-
-        for raw_line in lines:
-            line = raw_line.strip()
-            if not line or line.startswith('#'):
+        self.params = _ValidatedParams(self.params)
+
+    @classmethod
+    def from_dict(cls, params):
+        """
+        Builds a parser from a params dict, e.g. one returned by as_dict(). Every value goes
+        through the same per-key checks as a config file line (None keeps the default); params
+        that come from a parser (and so were already defaulted and validated) are not checked again.
+        """
+        parser = cls.__new__(cls)
+        parser.filepath = None
+        if isinstance(params, _ValidatedParams):
+            parser.params = _ValidatedParams(params)
+            return parser
+        parser.params = dict(cls.DEFAULTS)
+        for key, value in params.items():
+            key = key.upper()
+            if key not in parser.params:
+                raise ValueError(f"Unknown config key: {key}")
+            if value is None:
                 continue
+            if key in cls._BUFFERED_KEYS:
+                if isinstance(value, str):
+                    parser._parse_buffered_value(key, value)
+                else:
+                    parser._set_buffered_value(key, copy.deepcopy(value))
+            else:
+                parser._parse_single_key(key, str(value))
+        parser._apply_defaults()
+        parser._validate()
+        parser.params = _ValidatedParams(parser.params)
+        return parser
 
-            if '#' in line:
-                line = line.split('#', 1)[0].strip()
+    @staticmethod
+    def clear_cache():
+        _parse_config_cached.cache_clear()
 
-            if parsing_key:
-                buffer += ' ' + line
-                bracket_balance += line.count('[') - line.count(']')
-                if bracket_balance <= 0:
-                    self._parse_buffered_value(parsing_key, buffer)
-                    parsing_key = None
-                    buffer = ""
-                continue
+    def _parse(self):
+        buffer = []  # lines of a multi-line ORBITAL_INFO/COLOR_SCHEME value
+        parsing_key = None
 
-            if '=' in line:
-                key, value = map(str.strip, line.split('=', 1))
-                key = key.upper()
-
-                if key not in self.params:
-                    raise ValueError(f"Unknown config key: {key}")
-
-                if key in ['ORBITAL_INFO', 'COLOR_SCHEME']:
-                    buffer = value
-                    parsing_key = key
-                    bracket_balance = value.count('[') - value.count(']')
-                    if bracket_balance <= 0:
-                        self._parse_buffered_value(key, buffer)
-                        parsing_key = None
-                        buffer = ""
-                else:
-                    self._parse_single_key(key, value)
+        with open(self.filepath, 'r') as f:
+            for raw_line in f:
+                line = raw_line.partition('#')[0].strip()
+                if not line:
+                    continue
+
+                if parsing_key:
+                    buffer.append(line)
+                    # Only a line with a ']' can close the value; the brackets are counted over the
+                    # whole value just then instead of on every continuation line
+                    if ']' in line:
+                        value = ' '.join(buffer)
+                        if value.count('[') <= value.count(']'):
+                            self._parse_buffered_value(parsing_key, value)
+                            parsing_key = None
+                            buffer = []
+                    continue
+
+                if '=' in line:
+                    key, value = map(str.strip, line.split('=', 1))
+                    key = key.upper()
+
+                    if key not in self.params:
+                        raise ValueError(f"Unknown config key: {key}")
+
+                    if key in self._BUFFERED_KEYS:
+                        if value.count('[') <= value.count(']'):
+                            self._parse_buffered_value(key, value)
+                        else:
+                            buffer = [value]
+                            parsing_key = key
+                    else:
+                        self._parse_single_key(key, value)
 
     def _parse_buffered_value(self, key, buffer):
         try:
-            parsed = ast.literal_eval(buffer)
-        except Exception:
-            parsed = buffer.strip()
+            parsed = _parse_orbital_info(buffer) if key == 'ORBITAL_INFO' else _parse_color_scheme(buffer)
+        except ValueError:
+            # Anything the dedicated parsers don't cover is still read as a literal: JSON first
+            # (no AST to build), then a Python literal for single quotes, tuples and the like
+            try:
+                parsed = json.loads(buffer)
+            except ValueError:
+                try:
+                    parsed = ast.literal_eval(buffer)
+                except Exception:
+                    parsed = buffer.strip()
+        self._set_buffered_value(key, parsed)
 
+    def _set_buffered_value(self, key, parsed):
         if key == 'ORBITAL_INFO':
             if not isinstance(parsed, list):
                 raise ValueError("ORBITAL_INFO must be a list.")
@@ -133,9 +279,9 @@ class VASPStyleParser:
                 raise ValueError("COLOR_SCHEME must be int, list of color strings, or colormap name.")
 
     def _parse_single_key(self, key, value):
-        if key in ['ISPIN', 'DPI']:
+        if key in self._INT_KEYS:
             self.params[key] = int(value)
-        elif key in ['YMIN', 'YMAX','XMIN', 'XMAX','FIGSIZEX', 'FIGSIZEY', 'TRANSPARENCY', 'EFERMI', 'SCALE', 'BS_LINEWIDTH', 'TDOS_LINEWIDTH', 'PDOS_LINEWIDTH', 'SIGMA']:
+        elif key in self._FLOAT_KEYS:
             self.params[key] = float(value)
         elif key == 'LEGEND_LOC':
             self.params[key] = value.strip().lower()
@@ -175,21 +321,13 @@ class VASPStyleParser:
                 raise ValueError("SAVEAS must end with .jpg or .png")
             self.params[key] = val
         elif key == 'COLOR_SCHEME':
-            try:
-                parsed = ast.literal_eval(value)
-            except Exception:
-                parsed = value.strip()
-            self._parse_buffered_value(key, parsed)
+            self._parse_buffered_value(key, value)
         else:
             self.params[key] = value
 
     def _normalize_color(self, c):
         try:
-            c = str(c).strip().lstrip('#')
-            if len(c) == 6:
-                return '#' + c.upper()
-            # Try to interpret as named color
-            return mcolors.to_hex(c)
+            return normalize_color_str(str(c))
         except Exception:
             raise ValueError(f"Invalid color code or name: {c}")
 
@@ -198,12 +336,13 @@ class VASPStyleParser:
             if not (isinstance(item, (list, tuple)) and len(item) == 3):
                 raise ValueError("Each ORBITAL_INFO entry must be [atom_indices, element, orbital_indices].")
             atoms, element, orbitals = item
-            if not (isinstance(atoms, list) and all(isinstance(i, int) for i in atoms)):
-                raise ValueError("atom_indices must be a list of integers.")
+            if not (isinstance(atoms, list) and set(map(type, atoms)) <= _INT_TYPE and min(atoms, default=0) >= 0):
+                raise ValueError("atom_indices must be a list of non-negative integers.")
             if not isinstance(element, str):
                 raise ValueError("element must be a string.")
-            if not (isinstance(orbitals, list) and all(isinstance(i, int) for i in orbitals)):
-                raise ValueError("orbital_indices must be a list of integers.")
+            if not (isinstance(orbitals, list) and set(map(type, orbitals)) <= _INT_TYPE
+                    and min(orbitals, default=0) >= 0):
+                raise ValueError("orbital_indices must be a list of non-negative integers.")
 
     def _apply_defaults(self):
         if self.params['COLOR_SCHEME'] is None:
@@ -239,13 +378,15 @@ class VASPStyleParser:
                 if cs not in [0, 1]:
                     raise ValueError("COLOR_SCHEME integer must be 0 or 1.")
             elif isinstance(cs, str):
-                if not hasattr(cm, cs):
+                # A registry lookup; hasattr(cm, cs) went through cm's attribute fallback and also
+                # accepted non-colormap attributes such as 'get_cmap'
+                from matplotlib import colormaps
+                if cs not in colormaps:
                     raise ValueError(f"Unknown matplotlib colormap: {cs}")
             elif isinstance(cs, list):
-                try:
-                    [self._normalize_color(c) for c in cs]
-                except Exception:
-                    raise ValueError("Invalid entry in COLOR_SCHEME list.")
+                # Config files and from_dict both set lists through _set_buffered_value, which has
+                # already normalized, and so validated, every entry
+                pass
             else:
                 raise ValueError("Invalid COLOR_SCHEME format.")
        
@@ -261,104 +402,504 @@ class VASPStyleParser:
     def get(self, key):
         return self.params.get(key.upper())
 
-    def as_dict(self):
-        return self.params.copy()
+    def as_dict(self, copy=True):
+        """
+        Returns the params; copy=False hands out the parser's own dict (read-only use) without
+        allocating a new one.
+        """
+        return _ValidatedParams(self.params) if copy else self.params
+
+
+class _ValidatedParams(dict):
+    """Params dict produced by VASPStyleParser, marking it as already validated for from_dict."""
+    __slots__ = ()
 
 
-def read_band_energies_and_klist_from_PROCAR(file_path, ispin=1):
+@functools.lru_cache(maxsize=32)
+def _parse_config_cached(path, mtime_ns, size):
     """
-    Efficiently extracts band eigenvalues and k-point list (coordinates + weights) from PROCAR.
+    Parsed (not yet defaulted or validated) params of a config file. mtime_ns and size are only
+    part of the cache key: editing the file changes them, so a stale parse is never returned.
+    """
+    parser = VASPStyleParser.__new__(VASPStyleParser)
+    parser.filepath = path
+    parser.params = dict(VASPStyleParser.DEFAULTS)
+    parser._parse()
+    return parser.params
 
-    Parameters:
-    - file_path (str): Path to PROCAR file
-    - ispin (int): Spin polarization (1 or 2)
 
-    Returns:
-    - band_energies: np.ndarray
-        Shape (num_band, num_kpt) if ispin=1
-        Shape (2, num_band, num_kpt) if ispin=2
-    - klist: np.ndarray of shape (num_kpt, 5)
-        Each row: [kpt_index, kx, ky, kz, weight]
+class ProcarReader:
     """
+    Context manager around a single mmap of a PROCAR file. The header and the 'tot' column are
+    read once on entry, so every query on the same file shares one open (which matters on
+    network filesystems where opening a file is itself slow).
+
+    Usage:
+        with ProcarReader(path) as procar:
+            band_energies, klist = procar.read_energies_klist(ispin)
+            band_energies, klist, band_data = procar.read_projections([(0, 1), (2, 3)], ispin)
+    """
+    __slots__ = ('path', 'file', 'mm', 'num_kpt', 'num_band', 'num_ions', 'tot_index', 'data_start')
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.mm = None
+
+    def __enter__(self):
+        return self.open()
+
+    def open(self):
+        """
+        Maps the file and reads its header. Returns self; for readers that outlive a with block,
+        e.g. one handed to a background thread, which then has to call close() itself.
+        """
+        self.file = open(self.path, "rb")
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _parse_header(self):
+        mm = self.mm
+        mm.readline()  # skip first header line lm decomposed
+        header = mm.readline().decode("ascii").split()
+        self.num_kpt = int(header[header.index("k-points:") + 1])
+        self.num_band = int(header[header.index("bands:") + 1])
+        self.num_ions = int(header[header.index("ions:") + 1])
+        self.data_start = mm.tell()
+
+        # The first ion header sits a few lines in; its columns are the same for the whole file
+        self.tot_index = None
+        ion_header = mm.find(b"\nion", self.data_start)
+        if ion_header >= 0:
+            columns = mm[ion_header + 1:mm.find(b"\n", ion_header + 1)].split()
+            if b"tot" in columns:
+                self.tot_index = columns[1:].index(b"tot")
+
+    def read_energies_klist(self, ispin=1, dtype=np.float32):
+        """
+        Band energies and k-point list, taken with one regex sweep over the mapped file.
+
+        Parameters:
+        - ispin (int): 1 or 2 (from INCAR setting)
+        - dtype: dtype of band_energies (klist is always float64)
+
+        Returns:
+        - band_energies: np.ndarray
+            Shape (num_band, num_kpt) if ispin=1
+            Shape (2, num_band, num_kpt) if ispin=2
+        - klist: np.ndarray of shape (num_kpt, 5)
+            Each row: [kpt_index, kx, ky, kz, weight]
+        """
+        if ispin not in (1, 2):
+            raise ValueError("ISPIN must be 1 or 2")
+        num_kpt, num_band = self.num_kpt, self.num_band
+
+        kpt_matches = KPT_RE.findall(self.mm, self.data_start)
+        band_matches = BAND_RE.findall(self.mm, self.data_start)
+        if len(kpt_matches) < num_kpt * ispin or len(band_matches) < num_kpt * num_band * ispin:
+            raise ValueError("Invalid format")
 
-    print("[orbvis]Orbvis is reading band energies and kpoint list from PROCAR ...")   
-    with open(file_path, "r") as file:
-        next(file)  # Skip first header line
-        header = next(file).split()
-        num_kpt = int(header[header.index("k-points:") + 1])
-        num_band = int(header[header.index("bands:") + 1])
-        #num_ions = int(header[header.index("ions:") + 1])  # Not used in this, I have got this block from orbital specific bs 
+        # The second spin block repeats the k-point headers, only the first num_kpt are needed
+        klist = _klist_from_matches(kpt_matches[:num_kpt])
 
-        # Initialize arrays
+        # Energies come out in file order: spin, k-point, band
+        energies = np.fromstring(b" ".join(band_matches[:num_kpt * num_band * ispin]), dtype=dtype, sep=" ")
+        band_energies = np.ascontiguousarray(energies.reshape(ispin, num_kpt, num_band).transpose(0, 2, 1))
         if ispin == 1:
-            band_energies = np.zeros((num_band, num_kpt))
-        elif ispin == 2:
-            band_energies = np.zeros((2, num_band, num_kpt))
-        else:
+            band_energies = band_energies[0]
+        return band_energies, klist
+
+    def read_klist(self):
+        """
+        K-point list alone, for callers that get the energies elsewhere. The regex sweep stops
+        at the last k-point header of the first spin block.
+
+        Returns:
+        - klist: np.ndarray of shape (num_kpt, 5), as read_energies_klist
+        """
+        kpt_matches = [m.groups() for m in itertools.islice(KPT_RE.finditer(self.mm, self.data_start), self.num_kpt)]
+        if len(kpt_matches) < self.num_kpt:
+            raise ValueError("Invalid format")
+        return _klist_from_matches(kpt_matches)
+
+    def read_projections(self, projections, ispin=1, dtype=np.float32):
+        """
+        Single pass over the file that collects the band energies, the k-point list and every
+        requested orbital projection at once, instead of re-reading the file per orbital.
+
+        Parameters:
+        - projections (list of tuple): (ion_index, orbital_index) pairs, both starting from 0
+        - ispin (int): 1 or 2 (from INCAR setting)
+        - dtype: dtype of band_energies and band_data (klist is always float64)
+
+        Returns:
+        - band_energies, klist: same as read_energies_klist
+        - band_data: np.ndarray
+            Shape (n_proj, num_band, num_kpt) if ispin=1
+            Shape (n_proj, 2, num_band, num_kpt) if ispin=2
+        """
+        if ispin not in (1, 2):
             raise ValueError("ISPIN must be 1 or 2")
 
-        klist = np.zeros((num_kpt, 5))  # [index, kx, ky, kz, weight]
+        # Each distinct (ion, orbital) pair gets one output slot, sorted so every ion line is walked once
+        # and all of its orbital columns are picked in one pass; pairs repeated across ORBITAL_INFO
+        # entries are read once, and the inverse index restores the caller's order.
+        proj = np.asarray(projections, dtype=int).reshape(-1, 2)
+        if (proj < 0).any():
+            raise ValueError("Ion and orbital indices must be non-negative")
+        slots, inverse = np.unique(proj, axis=0, return_inverse=True)
+        proj_ions = slots[:, 0]
+        proj_cols = slots[:, 1] + 1  # +1 skips ion number
 
-        # State tracking
-        current_kpt = -1
-        current_band = -1
-        current_spin = 0
+        scan = scan_procar_jit if NUMBA_AVAILABLE else _scan_procar_python
+        band_energies, klist, band_data = scan(self, ispin, proj_ions, proj_cols, dtype)
 
-        for line in file:
-            line = line.strip()
-            if not line:
-                continue
+        band_data = band_data[inverse.reshape(-1)]
+        if ispin == 1:
+            return band_energies[0], klist, band_data[:, 0]
+        return band_energies, klist, band_data
+
+
+def _klist_from_matches(kpt_matches):
+    # [index, kx, ky, kz, weight]; the matched numbers are joined into one buffer and converted by a single C-level parse
+    klist = np.zeros((len(kpt_matches), 5))
+    klist[:, 0] = np.arange(len(kpt_matches))
+    klist[:, 1:] = np.fromstring(b" ".join(b" ".join(m) for m in kpt_matches), sep=" ").reshape(-1, 4)
+    return klist
 
-            if line.startswith("k-point"):
-                current_kpt += 1
-                current_band = -1
-                
 
-                if current_spin == 0:  
-        
-                    float_values = re.findall(r"[-+]?\d*\.\d+|\d+", line)
+def _scan_procar_python(procar, ispin, proj_ions, proj_cols, dtype):
+    """
+    Pure-Python fallback of the PROCAR state machine, used when numba is not installed.
+    Reads the header lines of the ProcarReader's mmap and jumps over the ion tables with find();
+    proj_ions/proj_cols are sorted by ion and the arrays keep a leading spin axis for both ispin values.
+    """
+    wanted_ions = set(proj_ions.tolist())
+    num_kpt, num_band, num_ions = procar.num_kpt, procar.num_band, procar.num_ions
+
+    mm = procar.mm
+    if hasattr(mm, "madvise"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    mm.seek(procar.data_start)
+    file = iter(mm.readline, b"")
+
+    # Zeros, like the projections: a truncated PROCAR leaves its missing bands at 0.0 rather than garbage
+    band_energies = np.zeros((ispin, num_band, num_kpt), dtype=dtype)
+    band_data = np.zeros((len(proj_ions), ispin, num_band, num_kpt), dtype=dtype)
+    klist = np.zeros((num_kpt, 5))  # [index, kx, ky, kz, weight]
+
+    current_kpt = -1
+    current_band = -1
+    current_spin = 0
+    in_ion_block = False
+    flat_cols = None  # slab positions of the requested values, fixed once the table width is known
+
+    for line in file:
+        line = line.strip()
+        # k-point, band and ion headers start with different letters: test one byte before startswith
+        first = line[:1]
+
+        if first == b"k" and line.startswith(b"k-point"):
+            current_kpt += 1
+            current_band = -1
+            in_ion_block = False
+            # Move to second spin block once every k-point of the first one has been read
+            if current_kpt == num_kpt:
+                current_spin += 1
+                if current_spin >= ispin:
+                    break
+                current_kpt = 0
+
+            if current_spin == 0:
+                # "k-point  I :  kx ky kz  weight = w" splits into fixed positions, unless negative
+                # coordinates run into each other ("0.5-0.5"), which the regex still handles
+                tokens = line.split()
+                try:
+                    klist[current_kpt] = [current_kpt, float(tokens[3]), float(tokens[4]), float(tokens[5]),
+                                          float(tokens[-1])]
+                except (ValueError, IndexError):
+                    float_values = _KPT_LINE_NUMBER_RE.findall(line)
                     if len(float_values) >= 4:
                         kx, ky, kz = map(float, float_values[1:4])
                         weight = float(float_values[-1])
                         klist[current_kpt] = [current_kpt, kx, ky, kz, weight]
-                        
-                    else: 
+                    else:
                         raise ValueError("Invalid format")
+            continue
 
-                continue
-
-            if line.startswith("band"):
-                current_band += 1
+        if first == b"b" and line.startswith(b"band"):
+            current_band += 1
+            if current_band >= num_band or current_kpt < 0:
+                raise ValueError(LAYOUT_ERROR)
+            in_ion_block = True
+            try:
+                parts = line.split()
+                energy = float(parts[parts.index(b"energy") + 1])
+            except (ValueError, IndexError):
+                energy = 0.0
+            band_energies[current_spin, current_band, current_kpt] = energy
+            continue
+
+        if first == b"i" and in_ion_block and line.startswith(b"ion"):
+            in_ion_block = False  # only the first ion table after a band line is read
+            # The table runs up to its tot line; everything after that (the tot line, the three SOC
+            # spin blocks, the LORBIT=12 phase block) is jumped over with find() instead of read line by line
+            table_start = mm.tell()
+            if wanted_ions:
+                table_end = mm.find(b"\ntot", table_start)
+                if table_end < 0:
+                    table_end = len(mm)
+                # The ion table is a fixed num_ions x n_cols float grid: convert the mapped bytes
+                # as one slab instead of splitting every row
+                if flat_cols is None:
+                    n_cols = len(line.split())
+                    # out-of-range ions/orbitals read as 0.0, like an unreadable value
+                    in_table = (proj_ions >= 0) & (proj_ions < num_ions) & (proj_cols >= 1) & (proj_cols < n_cols)
+                    flat_cols = np.where(in_table, proj_ions * n_cols + proj_cols, 0)
+                slab = mm[table_start:table_end]
                 try:
-                    parts = line.split()
-                    energy = float(parts[parts.index("energy") + 1])
+                    block = np.fromstring(slab, sep=" ")
+                    if block.size != num_ions * n_cols:
+                        raise ValueError("Incomplete ion table")
+                    values = np.where(in_table, block[flat_cols], 0.0)
                 except (ValueError, IndexError):
-                    energy = 0.0
+                    rows = slab.splitlines()
+                    values = [_safe_float(rows[ion].split() if ion < len(rows) else [], col)
+                              for ion, col in zip(proj_ions, proj_cols)]
+                band_data[:, current_spin, current_band, current_kpt] = values
+            else:
+                table_end = table_start
 
-                if ispin == 1:
-                    band_energies[current_band, current_kpt] = energy
-                else:
-                    band_energies[current_spin, current_band, current_kpt] = energy
+            # The last band of a k-point is followed by the next k-point line, any other by the next band line
+            if current_band < num_band - 1:
+                resume = mm.find(b"\nband", table_end)
+            else:
+                # Every value has been read once the last band of the last k-point is done
+                if current_kpt == num_kpt - 1 and current_spin == ispin - 1:
+                    break
+                resume = mm.find(b"k-point", table_end)
+                # A band line before the next k-point means more bands than the header declares
+                if mm.find(b"\nband", table_end, resume if resume >= 0 else len(mm)) >= 0:
+                    raise ValueError(LAYOUT_ERROR)
+                if resume >= 0:
+                    resume = mm.rfind(b"\n", 0, resume)
+            mm.seek(resume + 1 if resume >= 0 else len(mm))
 
-            # Move to second spin block
-            if ispin == 2 and current_kpt == num_kpt - 1 and current_band == num_band - 1:
-                current_spin += 1
-                if current_spin >= 2:
-                    break  # Finished both spin channels
-                current_kpt = -1
-                current_band = -1
+    return band_energies, klist, band_data
+
+
+def _safe_float(parts, col):
+    try:
+        return float(parts[col])
+    except (ValueError, IndexError):
+        return 0.0
+
+
+def _procar_cache_path(file_path, ispin, projections, dtype):
+    """
+    Cache file for one parse of a PROCAR. The key is built from the file's path, mtime and size
+    (not its contents, which can be several GB), the requested spin/projections, the orbvis
+    version and CACHE_FORMAT, so editing the file or upgrading orbvis never returns stale arrays.
+    """
+    st = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}|{ispin}|{list(map(tuple, projections))}|{np.dtype(dtype).name}|{__version__}|{CACHE_FORMAT}"
+    return os.path.join(CACHE_DIR, hashlib.blake2b(key.encode()).hexdigest()[:16])
+
+
+def _load_cached(cache_path, names):
+    """
+    Opens the cached arrays as read-only memory maps, so only the pages that are actually
+    used (e.g. the plotted k-points of a large projection tensor) are read from disk.
+    """
+    try:
+        arrays = {name: np.load(os.path.join(cache_path, name + ".npy"), mmap_mode='r') for name in names}
+    except (OSError, ValueError):
+        return None  # missing or unreadable cache file, parse again
+    try:
+        os.utime(cache_path)  # mark as recently used for _prune_cache
+    except OSError:
+        pass
+    return arrays
+
+
+def _save_cached(cache_path, verbose=True, **arrays):
+    # Written to a temporary directory and renamed into place, so a half-written cache is never loaded
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=_CACHE_TMP_PREFIX, dir=CACHE_DIR)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, name + ".npy"), array)
+        try:
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if not os.path.isdir(cache_path):
+                raise
+            # An existing entry is only written over after it failed to load; replace it
+            shutil.rmtree(cache_path, ignore_errors=True)
+            os.replace(tmp_path, cache_path)
+        _prune_cache(keep=cache_path)
+    except OSError:
+        if tmp_path is not None:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        if verbose and not os.path.isdir(cache_path):  # not just lost a race with another process writing the same cache
+            print("[orbvis]Could not write PROCAR cache to "+cache_path)
+
+
+def _reader(file_path, procar):
+    # A reader passed in by the caller stays open (the caller closes it), otherwise the file is opened here
+    return contextlib.nullcontext(procar) if procar is not None else ProcarReader(file_path)
+
+
+def _dir_size(path):
+    with os.scandir(path) as it:
+        return sum(entry.stat(follow_symlinks=False).st_size for entry in it)
+
+
+def _prune_cache(keep=None):
+    """
+    Keeps CACHE_DIR under CACHE_MAX_BYTES by removing the least recently used entries (keep,
+    the entry just written, always stays), and removes leftovers of interrupted writes and
+    .npz files of the first cache format. Anything else in the directory is left alone.
+    """
+    now = time.time()
+    entries = []
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name.startswith(_CACHE_TMP_PREFIX):
+                        if now - entry.stat(follow_symlinks=False).st_mtime > _CACHE_TMP_MAX_AGE:
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                    elif _CACHE_ENTRY_RE.fullmatch(entry.name):
+                        entries.append((entry.stat(follow_symlinks=False).st_mtime, _dir_size(entry.path), entry.path))
+                elif entry.name.endswith(".npz") and _CACHE_ENTRY_RE.fullmatch(entry.name[:-4]):
+                    os.remove(entry.path)
+    except OSError:
+        return  # pruning is best effort, another process may be pruning at the same time
+
+    # Newest first, every entry past the size limit goes
+    entries.sort(reverse=True)
+    total = 0
+    for _, size, path in entries:
+        total += size
+        if total > CACHE_MAX_BYTES and path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def read_band_energies_and_klist_from_PROCAR(file_path, ispin=1, cache=True, dtype=np.float32, procar=None):
+    """
+    Efficiently extracts band eigenvalues and k-point list (coordinates + weights) from PROCAR.
+
+    Parameters:
+    - file_path (str): Path to PROCAR file
+    - ispin (int): Spin polarization (1 or 2)
+    - cache (bool): Reuse/store the parsed arrays in CACHE_DIR; arrays loaded from the cache are read-only memory maps
+    - dtype: dtype of band_energies; PROCAR energies carry 8 digits, pass np.float64 to keep all of them
+    - procar (ProcarReader, optional): open reader of file_path to use instead of opening the file again
+
+    Returns:
+    - band_energies: np.ndarray
+        Shape (num_band, num_kpt) if ispin=1
+        Shape (2, num_band, num_kpt) if ispin=2
+    - klist: np.ndarray of shape (num_kpt, 5)
+        Each row: [kpt_index, kx, ky, kz, weight]
+    """
+
+    print("[orbvis]Orbvis is reading band energies and kpoint list from PROCAR ...")
+    if cache:
+        cache_path = _procar_cache_path(file_path, ispin, [], dtype)
+        cached = _load_cached(cache_path, ("band", "klist"))
+        if cached is not None:
+            print("[orbvis]Orbvis loaded band energies and kpoint list from cache "+cache_path)
+            return cached["band"], cached["klist"]
+
+    with _reader(file_path, procar) as procar:
+        band_energies, klist = procar.read_energies_klist(ispin, dtype)
+    if cache:
+        _save_cached(cache_path, band=band_energies, klist=klist)
     print("[orbvis]Orbvis is done reading band energies and kpoint list from PROCAR")
     return band_energies, klist
 
+
+def read_bands_and_projections_from_PROCAR(file_path, projections, ispin=1, cache=True, dtype=np.float32,
+                                           procar=None, verbose=True):
+    """
+    Reads band energies, k-point list and several orbital projections from PROCAR in one pass.
+
+    Parameters:
+    - file_path (str): Path to the PROCAR file
+    - projections (list of tuple): (ion_index, orbital_index) pairs, both starting from 0
+    - ispin (int): 1 or 2 (from INCAR setting)
+    - cache (bool): Reuse/store the parsed arrays in CACHE_DIR; arrays loaded from the cache are read-only memory maps
+    - dtype: dtype of band_energies and band_data, pass np.float64 for full precision
+    - procar (ProcarReader, optional): open reader of file_path to use instead of opening the file again
+    - verbose (bool): print progress messages; off when parsing in the background of a prompt
+
+    Returns:
+    - band_energies, klist: same as read_band_energies_and_klist_from_PROCAR
+    - band_data: np.ndarray, one orbvis_orbital_specific_band_data_from_PROCAR array per projection
+        stacked along the first axis
+    - tot_index (int or None): orbital index of the 'tot' column, as get_tot_index_from_procar
+    """
+    if verbose:
+        print("[orbvis]Orbvis is reading band energies, kpoint list and "+str(len(projections))+" orbital projections from PROCAR ...")
+    if cache:
+        cached = read_cached_bands_and_projections(file_path, projections, ispin, dtype, verbose)
+        if cached is not None:
+            return cached
+        cache_path = _procar_cache_path(file_path, ispin, projections, dtype)
+
+    with _reader(file_path, procar) as procar:
+        band_energies, klist, band_data = procar.read_projections(projections, ispin, dtype)
+        tot_index = procar.tot_index
+    if cache:
+        # A PROCAR without a 'tot' column is stored as -1, since None would need a pickled .npy
+        _save_cached(cache_path, verbose, band=band_energies, klist=klist, projections=band_data,
+                     tot_index=-1 if tot_index is None else tot_index)
+    if verbose:
+        print("[orbvis]Orbvis is done reading PROCAR")
+    return band_energies, klist, band_data, tot_index
+
+
+def read_cached_bands_and_projections(file_path, projections, ispin=1, dtype=np.float32, verbose=True):
+    """
+    The result of read_bands_and_projections_from_PROCAR from CACHE_DIR, without touching the
+    PROCAR beyond a stat. Returns None if nothing is cached for this file version and request.
+    """
+    cache_path = _procar_cache_path(file_path, ispin, projections, dtype)
+    cached = _load_cached(cache_path, ("band", "klist", "projections", "tot_index"))
+    if cached is None:
+        return None
+    if verbose:
+        print("[orbvis]Orbvis loaded PROCAR data from cache "+cache_path)
+    tot_index = int(cached["tot_index"])
+    return cached["band"], cached["klist"], cached["projections"], None if tot_index < 0 else tot_index
+
+
 def get_tot_index_from_procar(path):
-    with open(path) as f:
-        for line in f:
-            if line.strip().startswith('ion') and 'tot' in line:
-                return line.strip().split()[1:].index('tot')
-            
-
-def orbvis_orbital_specific_band_data_from_PROCAR(file_path,ion_index,orbital_index, ispin=1):
-   
+    with ProcarReader(path) as procar:
+        return procar.tot_index
+
+
+def orbvis_orbital_specific_band_data_from_PROCAR(file_path,ion_index,orbital_index, ispin=1, dtype=np.float32):
+
     """
     Extracts orbital-projected band structure data from a VASP PROCAR file in a memory efficient manner by reading it line-by-line.
     Does not load the entire procar file into memory as it can be quite large for some calculations
@@ -367,89 +908,24 @@ def orbvis_orbital_specific_band_data_from_PROCAR(file_path,ion_index,orbital_in
     - ion_index (int): index of the ion (atom) starting from 0
     - orbital_index (int): index of the orbital column (s=0, py=1, ..., x2-y2=8, tot=9)
     - ispin (int): 1 or 2 (from INCAR setting)
+    - dtype: dtype of the returned array, pass np.float64 for full precision
 
     Returns:
     - numpy.ndarray: Shape (num_band, num_kpt) for ispin=1, or (2, num_band, num_kpt) for ispin=2
     """
     print("[orbvis]Orbvis is reading orbital specific band data from PROCAR for atom "+str(ion_index)+"'s orbital "+str(orbital_index))
-    with open(file_path, "r") as file:
-        next(file)  # skip first header line lm decomposed 
-        header = next(file)  # read second line
-        temp_h = header.split()
-        num_kpt = int(temp_h[temp_h.index("k-points:") + 1])
-        num_band = int(temp_h[temp_h.index("bands:") + 1])
-        #num_ions = int(temp_h[temp_h.index("ions:") + 1])
-        
-        #initialize output array
-        if ispin == 1:
-            band_data = np.zeros(( num_band, num_kpt))
-        elif ispin == 2:
-            band_data = np.zeros((2,num_band,num_kpt))
-        else:
-            raise ValueError("Invalid ispin value (must be either 1 or 2)")
-
-        current_kpt = -1
-        current_band = -1
-        current_spin = 0
-        ion_line_counter = 0
-        in_spin_block = True
+    with ProcarReader(file_path) as procar:
+        _, _, band_data = procar.read_projections([(ion_index, orbital_index)], ispin, dtype)
+    return band_data[0]
 
-        for line in file:
-            line = line.strip()
-
-            if not line:
-                continue  # Skip empty lines
-
-            if line.startswith("k-point"):
-                current_kpt += 1
-                current_band = -1
-                ion_line_counter = 0
-                continue
-
-            if line.startswith("band"):
-                current_band += 1
-                ion_line_counter = 0
-                continue
 
-            if line.startswith("ion"):
-                continue  # Skip orbital header line
-
-            if line.startswith("tot"):
-                continue  # Skip total line
-
-            # currently in the ion lines now
-            if current_kpt >= 0 and current_band >= 0:
-                ion_line_counter += 1
-                if ion_line_counter == ion_index + 1:  # 1 based counting in PROCAR
-                    try:
-                        value = float(line.split()[orbital_index + 1])  # +1 skips ion number
-                    except (ValueError, IndexError):
-                        value = 0.0
-                    if ispin == 1:
-                        band_data[current_band,current_kpt] = value
-                    elif ispin ==2:
-                        band_data[current_spin, current_band, current_kpt] = value
-
-            # If ispin = 2, check if we are starting the second spin block
-            if ispin == 2 and current_kpt == num_kpt - 1 and current_band == num_band - 1:
-                current_spin += 1
-                if current_spin >= 2:
-                    break  # Done reading both spin blocks so exit loop
-                current_kpt = -1
-                current_band = -1
-                ion_line_counter = 0
-
-
-    return band_data
-
-
-
-def read_band_energies_and_klist_from_PROCAR_SOC(file_path):
+def read_band_energies_and_klist_from_PROCAR_SOC(file_path, dtype=np.float32):
     """
     Extract band energies and k-point list from PROCAR in LSORBIT (SOC) mode.
 
     Parameters:
     - file_path (str): Path to the PROCAR file
+    - dtype: dtype of band_energies, pass np.float64 for full precision
 
     Returns:
     - band_energies: np.ndarray of shape (num_band, num_kpt)
@@ -458,51 +934,17 @@ def read_band_energies_and_klist_from_PROCAR_SOC(file_path):
 
     print("[orbvis]Orbvis is reading band energies and k-point list from PROCAR (SOC)...")
 
-    with open(file_path, 'r') as file:
-        next(file)  # Skip first line
-        header = next(file).split()
-        num_kpt = int(header[header.index("k-points:") + 1])
-        num_band = int(header[header.index("bands:") + 1])
-        # num_ions = int(header[header.index("ions:") + 1])  # Optional
-
-        band_energies = np.zeros((num_band, num_kpt))
-        klist = np.zeros((num_kpt, 5))  # [index, kx, ky, kz, weight]
-
-        current_kpt = -1
-        current_band = -1
-
-        for line in file:
-            line = line.strip()
-            if not line:
-                continue
-
-            if line.startswith("k-point"):
-                current_kpt += 1
-                current_band = -1
-
-                float_values = re.findall(r"[-+]?\d*\.\d+|\d+", line)
-                if len(float_values) >= 4:
-                    kx, ky, kz = map(float, float_values[1:4])
-                    weight = float(float_values[-1])
-                    klist[current_kpt] = [current_kpt, kx, ky, kz, weight]
-                else:
-                    raise ValueError("Invalid k-point format")
-
-            elif line.startswith("band"):
-                current_band += 1
-                try:
-                    parts = line.split()
-                    energy = float(parts[parts.index("energy") + 1])
-                except (ValueError, IndexError):
-                    energy = 0.0
-                band_energies[current_band, current_kpt] = energy
+    # The band lines of a SOC PROCAR are laid out as for ISPIN=1, only the ion tables repeat,
+    # so the energies come from the same single regex sweep
+    with ProcarReader(file_path) as procar:
+        band_energies, klist = procar.read_energies_klist(1, dtype)
 
     print("[orbvis]Orbvis is done reading PROCAR(SOC).")
     return band_energies, klist
 
 
 
-def orbvis_orbital_specific_band_data_from_PROCAR_SOC(file_path, ion_index, orbital_index):
+def orbvis_orbital_specific_band_data_from_PROCAR_SOC(file_path, ion_index, orbital_index, dtype=np.float32):
     """
     Extracts orbital-projected band structure data from a VASP PROCAR file with LSORBIT = .TRUE. (SOC).
     Only reads the first of four projection blocks (orbital character, not spin components).
@@ -511,59 +953,18 @@ def orbvis_orbital_specific_band_data_from_PROCAR_SOC(file_path, ion_index, orbi
     - file_path (str): Path to the PROCAR file
     - ion_index (int): index of the ion (starting from 0)
     - orbital_index (int): index of the orbital column (s=0, py=1, ..., x2-y2=8, tot=9)
+    - dtype: dtype of band_data, pass np.float64 for full precision
 
     Returns:
     - band_data: np.ndarray of shape (num_band, num_kpt)
     """
     print(f"[orbvis]Orbvis is reading orbital {orbital_index} of atom {ion_index} from PROCAR (SOC)...")
 
-    with open(file_path, "r") as file:
-        next(file)  # Skip first comment line
-        header = next(file).split()
-        num_kpt = int(header[header.index("k-points:") + 1])
-        num_band = int(header[header.index("bands:") + 1])
-        # num_ions = int(header[header.index("ions:") + 1])  # Not used here
-
-        band_data = np.zeros((num_band, num_kpt))
-
-        current_kpt = -1
-        current_band = -1
-        ion_line_counter = 0
-        in_first_block = True
-
-        for line in file:
-            line = line.strip()
-
-            if not line:
-                continue
-
-            if line.startswith("k-point"):
-                current_kpt += 1
-                current_band = -1
-                continue
-
-            if line.startswith("band"):
-                current_band += 1
-                ion_line_counter = 0
-                in_first_block = True
-                continue
-
-            if line.startswith("ion"):
-                continue  # Skip orbital label row
-
-            if line.startswith("tot"):
-                if in_first_block:
-                    in_first_block = False  # Now entering spin-x block
-                continue  # Skip 'tot' line
-
-            if current_kpt >= 0 and current_band >= 0 and in_first_block:
-                ion_line_counter += 1
-                if ion_line_counter == ion_index + 1:
-                    try:
-                        value = float(line.split()[orbital_index + 1])  # +1 skips 'ion' index
-                    except (ValueError, IndexError):
-                        value = 0.0
-                    band_data[current_band, current_kpt] = value
+    # Only the first ion table after each band line is read, which is exactly the
+    # first of the four SOC blocks, so this is the ISPIN=1 scan
+    with ProcarReader(file_path) as procar:
+        _, _, band_data = procar.read_projections([(ion_index, orbital_index)], 1, dtype)
+    band_data = band_data[0]
 
     print("[orbvis]Orbvis is done reading orbital-projected data(SOC).")
     return band_data
@@ -0,0 +1,284 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:orbvis/band/parser_numba.py
+
+Optional numba-compiled PROCAR parser. The kernel walks the raw bytes of the file
+(mmapped, never decoded into Python strings) line by line and converts every needed number
+itself. It fills the same arrays as orbvis.band.parser._scan_procar_python, which instead
+jumps between header lines with find() and converts whole ion tables with np.fromstring;
+tests/test_procar_parser.py checks that the two agree. If numba is not installed
+NUMBA_AVAILABLE is False and the pure-Python reader is used instead.
+
+Author: Taradutt Pattnaik
+Created: 2025-06-11
+"""
+import os
+import re
+import threading
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+
+# Files at least this large are split into k-point aligned byte ranges and parsed on several threads
+PARALLEL_MIN_BYTES = 1 << 26
+
+# Raised by both scanners for a PROCAR with more bands or k-points than its header declares
+LAYOUT_ERROR = "Invalid format: the PROCAR has more bands or k-points than its header declares"
+
+_KPT_HEADER_RE = re.compile(rb"^[ \t]*k-point\s+(\d+)\s*:", re.M)
+
+_NEWLINE = 10
+_SPACE = 32
+_MINUS = 45
+_PLUS = 43
+_DOT = 46
+_ZERO = 48
+_NINE = 57
+
+
+@njit(cache=True, boundscheck=False)
+def _skip_to_number(buf, pos, end):
+    while pos < end:
+        c = buf[pos]
+        if (_ZERO <= c <= _NINE) or c == _MINUS or c == _PLUS or c == _DOT:
+            return pos
+        pos += 1
+    return pos
+
+
+@njit(cache=True, boundscheck=False)
+def _atof(buf, pos, end):
+    """
+    Parses one float starting at the first number-like byte at or after pos.
+    Returns (value, position just past the number). Stops at the first byte that
+    cannot continue the number, so '0.5-0.5' is read as two values.
+    """
+    pos = _skip_to_number(buf, pos, end)
+    sign = 1.0
+    if pos < end and (buf[pos] == _MINUS or buf[pos] == _PLUS):
+        if buf[pos] == _MINUS:
+            sign = -1.0
+        pos += 1
+    mantissa = 0.0
+    while pos < end and _ZERO <= buf[pos] <= _NINE:
+        mantissa = mantissa * 10.0 + (buf[pos] - _ZERO)
+        pos += 1
+    if pos < end and buf[pos] == _DOT:
+        pos += 1
+        scale = 1.0
+        while pos < end and _ZERO <= buf[pos] <= _NINE:
+            mantissa = mantissa * 10.0 + (buf[pos] - _ZERO)
+            scale *= 10.0
+            pos += 1
+        mantissa /= scale
+    if pos < end and (buf[pos] == 69 or buf[pos] == 101):  # 'E' / 'e'
+        pos += 1
+        exp_sign = 1
+        if pos < end and (buf[pos] == _MINUS or buf[pos] == _PLUS):
+            if buf[pos] == _MINUS:
+                exp_sign = -1
+            pos += 1
+        exponent = 0
+        while pos < end and _ZERO <= buf[pos] <= _NINE:
+            exponent = exponent * 10 + (buf[pos] - _ZERO)
+            pos += 1
+        mantissa *= 10.0 ** (exp_sign * exponent)
+    return sign * mantissa, pos
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _parse_block(buf, start, end, first_kpt, first_spin, ion_offsets, orb_targets, ispin, energies, out, klist):
+    """
+    Fills energies[spin, band, kpt], out[proj, spin, band, kpt] and klist[kpt] from
+    the PROCAR bytes in buf[start:end], which begin at k-point first_kpt of spin block
+    first_spin. The projections of ion i are out[ion_offsets[i]:ion_offsets[i + 1]], and
+    orb_targets holds their columns (orbital index + 1) in ascending order. Runs without
+    the GIL so disjoint byte ranges can be parsed concurrently.
+
+    Returns False, without writing out of bounds, as soon as a band or k-point falls outside
+    the arrays (a PROCAR with more bands or k-points than its header declares), else True.
+    """
+    num_kpt = klist.shape[0]
+    num_band = energies.shape[1]
+    n_ion_slots = ion_offsets.shape[0] - 1
+
+    current_kpt = first_kpt - 1
+    current_band = -1
+    current_spin = first_spin
+    ion_line_counter = 0
+    in_ion_block = False
+
+    pos = start
+    while pos < end:
+        # Find the bounds of the next line, ignoring leading blanks
+        line_end = pos
+        while line_end < end and buf[line_end] != _NEWLINE:
+            line_end += 1
+        while pos < line_end and buf[pos] == _SPACE:
+            pos += 1
+        if pos == line_end:
+            pos = line_end + 1
+            continue
+
+        first = buf[pos]
+        if first == 107:  # 'k' -> k-point header
+            current_kpt += 1
+            current_band = -1
+            in_ion_block = False
+            if current_kpt == num_kpt:
+                current_spin += 1
+                if current_spin >= ispin:
+                    break
+                current_kpt = 0
+            if current_kpt >= num_kpt:
+                return False
+            if current_spin == 0:
+                p = pos + 7  # skip 'k-point'
+                _, p = _atof(buf, p, line_end)
+                kx, p = _atof(buf, p, line_end)
+                ky, p = _atof(buf, p, line_end)
+                kz, p = _atof(buf, p, line_end)
+                while p < line_end and buf[p] != 61:  # '='
+                    p += 1
+                weight, p = _atof(buf, p, line_end)
+                klist[current_kpt, 0] = current_kpt
+                klist[current_kpt, 1] = kx
+                klist[current_kpt, 2] = ky
+                klist[current_kpt, 3] = kz
+                klist[current_kpt, 4] = weight
+        elif first == 98:  # 'b' -> band header
+            current_band += 1
+            if current_band >= num_band or current_kpt < 0:
+                return False
+            ion_line_counter = 0
+            in_ion_block = True
+            p = pos + 4  # skip 'band'
+            _, p = _atof(buf, p, line_end)
+            while p < line_end and buf[p] != 35:  # '#'
+                p += 1
+            energy, p = _atof(buf, p + 1, line_end)
+            energies[current_spin, current_band, current_kpt] = energy
+        elif first == 116:  # 't' -> tot line closes the first ion block
+            in_ion_block = False
+            if current_band == num_band - 1 and current_kpt == num_kpt - 1 and current_spin == ispin - 1:
+                break  # last band of the last k-point, nothing after it is needed
+        elif _ZERO <= first <= _NINE and in_ion_block:
+            ion = ion_line_counter
+            ion_line_counter += 1
+            if ion < n_ion_slots and ion_offsets[ion] < ion_offsets[ion + 1]:
+                # Column 0 is the ion number itself; walk the columns once, only as far as the last one needed
+                value, p = _atof(buf, pos, line_end)
+                col = 0
+                for t in range(ion_offsets[ion], ion_offsets[ion + 1]):
+                    while col < orb_targets[t]:
+                        value, p = _atof(buf, p, line_end)
+                        col += 1
+                    out[t, current_spin, current_band, current_kpt] = value
+        # 'i' (ion header), '#' (second spin header) and anything else is skipped
+        pos = line_end + 1
+    return True
+
+
+def _kpoint_chunks(mm, start, ispin, n_chunks):
+    """
+    Splits mm[start:] into up to n_chunks byte ranges that each begin on a k-point header.
+    Returns a list of (begin, end, first_kpt, first_spin).
+    """
+    spin_boundary = mm.find(b"# of k-points", start) if ispin == 2 else -1
+    begins = []
+    for i in range(n_chunks):
+        match = _KPT_HEADER_RE.search(mm, start + i * (len(mm) - start) // n_chunks)
+        if match is None:
+            break
+        if begins and begins[-1][0] == match.start():
+            continue
+        spin = 1 if 0 <= spin_boundary < match.start() else 0
+        begins.append((match.start(), int(match.group(1)) - 1, spin))
+    ends = [begin for begin, _, _ in begins[1:]] + [len(mm)]
+    return [(begin, end, kpt, spin) for (begin, kpt, spin), end in zip(begins, ends)]
+
+
+def _ion_offsets(ion_targets):
+    """
+    Offsets such that the projections of ion i are ion_targets[offsets[i]:offsets[i + 1]]
+    (ion_targets must be sorted). Built once per scan so the kernel never searches the targets.
+    """
+    n_slots = int(ion_targets.max()) + 1 if len(ion_targets) else 0
+    return np.searchsorted(ion_targets, np.arange(n_slots + 1)).astype(np.int64)
+
+
+def scan_procar_jit(procar, ispin, ion_targets, orb_targets, dtype=np.float64, workers=None):
+    """
+    Runs _parse_block over the mmap of an open ProcarReader. ion_targets/orb_targets must be
+    sorted by ion, then by column. Files of PARALLEL_MIN_BYTES or more are split on k-point
+    headers and parsed by `workers` threads (default: all CPUs); every range writes its own
+    k-points, so no locking is needed. The threads are daemons, so a scan running in the
+    background of an abandoned plot does not hold up interpreter exit.
+
+    Returns:
+    - band_energies: np.ndarray of shape (ispin, num_band, num_kpt), in the given dtype
+    - klist: np.ndarray of shape (num_kpt, 5)
+    - band_data: np.ndarray of shape (n_proj, ispin, num_band, num_kpt), in the given dtype
+    """
+    mm, start = procar.mm, procar.data_start
+    # Zeros, like the projections: a truncated PROCAR leaves its missing bands at 0.0 rather than garbage
+    band_energies = np.zeros((ispin, procar.num_band, procar.num_kpt), dtype=dtype)
+    band_data = np.zeros((len(ion_targets), ispin, procar.num_band, procar.num_kpt), dtype=dtype)
+    klist = np.zeros((procar.num_kpt, 5))
+
+    ion_offsets = _ion_offsets(np.asarray(ion_targets, dtype=np.int64))
+    orb_targets = np.asarray(orb_targets, dtype=np.int64)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(mm) >= PARALLEL_MIN_BYTES:
+        chunks = _kpoint_chunks(mm, start, ispin, workers)
+    else:
+        chunks = [(start, len(mm), 0, 0)]
+
+    buf = np.frombuffer(mm, dtype=np.uint8)
+
+    def parse(chunk):
+        begin, end, first_kpt, first_spin = chunk
+        if not _parse_block(buf, begin, end, first_kpt, first_spin, ion_offsets, orb_targets,
+                            ispin, band_energies, band_data, klist):
+            raise ValueError(LAYOUT_ERROR)
+
+    try:
+        if len(chunks) == 1:
+            parse(chunks[0])
+        else:
+            errors = []
+
+            def run(chunk):
+                try:
+                    parse(chunk)
+                except BaseException as exc:
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=run, args=(chunk,), daemon=True) for chunk in chunks]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if errors:
+                raise errors[0]
+    finally:
+        del buf, parse  # release the buffer export so the reader can close the map
+
+    return band_energies, klist, band_data
@@ -12,20 +12,26 @@ Author: Taradutt Pattnaik
 Created: 2025-06-11
 """
 
+import threading
+from concurrent.futures import Future
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.markers import MarkerStyle
+from matplotlib.transforms import IdentityTransform
 from matplotlib.colors import LinearSegmentedColormap
-import matplotlib.cm as cm
+from matplotlib import colormaps, rcParams
 import matplotlib.colors as mcolors
 from distinctipy import get_colors, get_hex
 
+from ..colors import normalize_color_str
+
 from .parser import (
-    read_band_energies_and_klist_from_PROCAR,
-    get_tot_index_from_procar,
-    orbvis_orbital_specific_band_data_from_PROCAR,
-    orbvis_orbital_specific_band_data_from_PROCAR_SOC,
-    read_band_energies_and_klist_from_PROCAR_SOC,
+    ProcarReader,
+    read_bands_and_projections_from_PROCAR,
+    read_cached_bands_and_projections,
 )
 from .utils import (
     orbital_labels,
@@ -34,11 +40,124 @@ from .utils import (
     insert_discontinuities,
     merge_close_ticks,
     get_valid_xlim,
-
+    flatten_orbital_info,
 )
 
+# Unit circle marker, built once and shared by every projection scatter
+_CIRCLE = MarkerStyle("o")
+_CIRCLE_PATH = _CIRCLE.get_path().transformed(_CIRCLE.get_transform())
+
+
+def _scatter(ax, xs, ys, sizes, color, alpha):
+    """
+    Adds one single-color circle scatter to ax as a bare PathCollection. Draws the same as
+    ax.scatter(xs, ys, s=sizes, color=color, alpha=alpha, rasterized=True) but skips its
+    color-mapping and per-argument validation. The edge width is passed explicitly: for a
+    filled marker such as 'o', ax.scatter leaves it at rcParams['patch.linewidth'] (only
+    unfilled markers use rcParams['lines.linewidth']).
+    """
+    collection = PathCollection(
+        (_CIRCLE_PATH,),
+        sizes,
+        offsets=np.column_stack([xs, ys]),
+        offset_transform=ax.transData,
+        facecolors=color,
+        edgecolors="face",
+        linewidths=(rcParams["patch.linewidth"],),
+        alpha=alpha,
+    )
+    collection.set_transform(IdentityTransform())
+    # Saved as an image at the figure dpi in PDF/SVG output, instead of one vector path per marker
+    collection.set_rasterized(True)
+    ax.add_collection(collection)
+    return collection
+
+
+def _visible_points(xs, ys, weights, rel_eps=1e-4):
+    """
+    Drops scatter points whose projection weight is at most rel_eps times the largest one
+    (as well as the NaN discontinuity columns), since their markers would not be visible.
+
+    Returns:
+    - xs, ys, weights: the kept points
+    """
+    mask = weights > rel_eps * np.nanmax(weights, initial=0.0)
+    return xs[mask], ys[mask], weights[mask]
+
+
+def _plot_spin(ax, x_arr, bs_spin, spin_data, scale, alpha, color_scheme, linewidth):
+    """
+    Draws the bands of one spin channel and their orbital projections on ax.
+
+    Parameters:
+    - ax: matplotlib Axes to draw on
+    - x_arr (np.ndarray): k-path positions, NaN at discontinuities
+    - bs_spin (np.ndarray): Band energies of shape (num_band, len(x_arr))
+    - spin_data (list of np.ndarray): Projection weights of the same shape, one per ORBITAL_INFO entry
+    - scale (float): Marker area per unit weight
+    - alpha (float): Marker opacity
+    - color_scheme (list of str): Marker color of each entry
+    - linewidth (float): Band line width
+    """
+    # All bands as one LineCollection artist; NaN columns still break the lines at discontinuities
+    ax.add_collection(LineCollection(np.stack(np.broadcast_arrays(x_arr, bs_spin), axis=-1), colors="black", linewidths=linewidth))
+    ax.autoscale_view()
+
+    # Every band of a projection goes into one scatter call: x repeats per band, y/sizes are flattened band-major
+    xs = np.tile(x_arr, bs_spin.shape[0])
+    ys = bs_spin.ravel()
+    for data_k, color in zip(spin_data, color_scheme):
+        xs_i, ys_i, w_i = _visible_points(xs, ys, data_k.ravel())
+        _scatter(ax, xs_i, ys_i, scale * w_i, color, alpha)
+
+
+def _in_background(func, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs) in a daemon thread and returns a Future of its result. Unlike a
+    ThreadPoolExecutor worker the thread is not joined at interpreter exit, so an error raised
+    before .result() is called ends the program without waiting for the work to finish.
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _read_projections(procar, projections, ispin, cache):
+    """
+    Parses the projections from an open ProcarReader without printing (the label prompt is
+    waiting for input meanwhile) and closes the reader when done.
+    """
+    try:
+        return read_bands_and_projections_from_PROCAR(procar.path, projections, ispin, cache=cache,
+                                                      procar=procar, verbose=False)
+    finally:
+        procar.close()
+
+
+def _check_orbital_info(data, tot_ind):
+    """
+    Raises ValueError for ORBITAL_INFO orbitals beyond the 'tot' column of the PROCAR.
+    """
+    for entry in data:
+        atom_list, element_name, orbital_list = entry
+
+        for orb in orbital_list:
+            if orb > tot_ind:
+                raise ValueError(f"Orbital index {orb} exceeds total index {tot_ind}.")
+        if len(orbital_list) > 1 and tot_ind in orbital_list:
+            raise ValueError("Don't mix 'tot' orbital with others.")
 
-def orbscatter(**params):
+
+def orbscatter(cache=True, **params):
     path = params["PROCAR_PATH"]
     data = params["ORBITAL_INFO"]
     ispin = params["ISPIN"]
@@ -61,12 +180,8 @@ def orbscatter(**params):
         processed_colors = []
         for c in color_scheme:
             if isinstance(c, str) or isinstance(c, int):  # support unquoted hex
-                c_str = str(c).strip()
-                if not c_str.startswith("#") and len(c_str) in [6, 3]:  # likely a hex without #
-                    c_str = f"#{c_str}"
                 try:
-                    hex_color = mcolors.to_hex(c_str)  # validate and normalize
-                    processed_colors.append(hex_color)
+                    processed_colors.append(normalize_color_str(str(c)))  # validate and normalize
                 except ValueError:
                     raise ValueError(f"Invalid color in COLOR_SCHEME: {c}")
             else:
@@ -83,8 +198,9 @@ def orbscatter(**params):
         color_scheme = processed_colors
     elif isinstance(color_scheme, str):
         try:
-            cmap = cm.get_cmap(color_scheme)
-            color_scheme = [mcolors.to_hex(cmap(i / (num_cases - 1))) for i in range(num_cases)]
+            cmap = colormaps[color_scheme]
+            # One vectorized colormap evaluation for all cases
+            color_scheme = [mcolors.to_hex(rgba) for rgba in cmap(np.arange(num_cases) / max(num_cases - 1, 1))]
         except Exception:
             raise ValueError(f"Invalid colormap: {color_scheme}")
     elif isinstance(color_scheme, int):
@@ -99,15 +215,32 @@ def orbscatter(**params):
 
     # ===== Data Loading =====
 
-    # Start of Code updated for soc
-    #bs, kl = read_band_energies_and_klist_from_PROCAR(path, ispin)
+    # Every (atom, orbital) pair in ORBITAL_INFO; the pairs of entry i are the rows group_slices[i]
+    atoms, orbitals, _, group_slices = flatten_orbital_info(data)
+    projections = list(zip(atoms.tolist(), orbitals.tolist()))
+
     if soc:
-        bs, kl = read_band_energies_and_klist_from_PROCAR_SOC(path)
-        ispin = 1  # Force ispin to 1 for plotting logic
+        # A SOC PROCAR is read like ISPIN=1: only the first of its four projection blocks is used
+        ispin = 1
+    cached = read_cached_bands_and_projections(path, projections, ispin) if cache else None
+    if cached is not None:
+        bs, kl, proj_data, tot_ind = cached
+        _check_orbital_info(data, tot_ind)
+        projections_future = None
     else:
-        bs, kl = read_band_energies_and_klist_from_PROCAR(path, ispin)
-    # End of of Code updated for soc
-    tot_ind = get_tot_index_from_procar(path)
+        # The PROCAR is opened once. Its header ('tot' column) and k-point list are read and ORBITAL_INFO
+        # is checked before the prompt; only then are the energies and projections parsed from the same
+        # map in the background while the user types the high-symmetry labels
+        procar = ProcarReader(path).open()
+        try:
+            tot_ind = procar.tot_index
+            _check_orbital_info(data, tot_ind)
+            print("[orbvis]Orbvis is reading the kpoint list from PROCAR ...")
+            kl = procar.read_klist()
+        except BaseException:
+            procar.close()
+            raise
+        projections_future = _in_background(_read_projections, procar, projections, ispin, cache)
     kl_new, hs = clean_kpoints(kl)
 
     print("The following high symmetry points were found:\n")
@@ -139,9 +272,26 @@ def orbscatter(**params):
 
     # Prepare distance mapping
     full_data, reduced_data = compute_kpoint_distances(kl_new, x_scale=3)
-    tick_vals = [dict(reduced_data)[i] for i in hs]
-    tick_vals, labels = merge_close_ticks(tick_vals, labels, tol=1e-5)
     idx_selected = reduced_data[:, 0].astype(int)
+    # reduced_data is ordered by k-point index, so every high-symmetry point is found by binary search
+    hs_pos = np.searchsorted(idx_selected, hs)
+    tick_vals = reduced_data[hs_pos, 1].tolist()
+    tick_vals, labels = merge_close_ticks(tick_vals, labels, tol=1e-5)
+
+    x_arr = reduced_data[:, 1]
+    ##New code for handling discontinuities
+    # A discontinuity is a k-point whose segment was zeroed by compute_kpoint_distances (a jump above
+    # its cutoff). The whole path is checked, so this does not depend on how clean_kpoints' jump
+    # threshold compares with that cutoff
+    discontinuity_indices = np.flatnonzero(np.diff(x_arr) == 0) + 1
+
+    # Insert discontinuities into x_arr
+    # The column positions are worked out once and reused for the energies and every projection
+    x_arr, disc_plan = insert_discontinuities(x_arr.reshape(1, -1), discontinuity_indices, return_plan=True)
+    x_arr = x_arr.flatten()
+    if projections_future is not None:
+        bs, _, proj_data, _ = projections_future.result()
+        print("[orbvis]Orbvis is done reading PROCAR")
 
     if ispin == 1:
         bs_selected = bs[:, idx_selected]
@@ -149,71 +299,34 @@ def orbscatter(**params):
         bs_selected = bs[:, :, idx_selected]
     if efermi is not None:
         bs_selected = bs_selected - efermi
-    
-    x_arr = reduced_data[:, 1]
-    ##New code for handling discontinuities
-    x_arr_raw = x_arr.copy()  # Save raw version for discontinuity checks
-    discontinuity_indices = np.where(np.diff(x_arr_raw) == 0)[0] + 1
-
-    # Insert discontinuities into x_arr
-    x_arr = insert_discontinuities(x_arr.reshape(1, -1), discontinuity_indices).flatten()
-    bs_selected = insert_discontinuities(bs_selected, discontinuity_indices)
+    bs_selected = insert_discontinuities(bs_selected, discontinuity_indices, plan=disc_plan)
     ##Code for handlingdiscontinuity ends
+    # Only the plotted k-points are summed, so weighted (HSE) and duplicate k-points are dropped before the reductions
+    proj_selected = proj_data[..., idx_selected]
     all_procar_data = []
     all_labels = []
 
-    for entry in data:
+    for entry, group in zip(data, group_slices):
         atom_list, element_name, orbital_list = entry
 
-        for orb in orbital_list:
-            if orb > tot_ind:
-                raise ValueError(f"Orbital index {orb} exceeds total index {tot_ind}.")
-        if len(orbital_list) > 1 and tot_ind in orbital_list:
-            raise ValueError("Don't mix 'tot' orbital with others.")
-
         label = element_name
-        procar_data = np.zeros_like(bs)
-
-        for i, atom in enumerate(atom_list):
-            for j, orbital in enumerate(orbital_list):
-                # Start of Code updated for soc
-                #procar_data += orbvis_orbital_specific_band_data_from_PROCAR(path, atom, orbital, ispin)
-                if soc:
-                    procar_data += orbvis_orbital_specific_band_data_from_PROCAR_SOC(path, atom, orbital)
-                else:
-                    procar_data += orbvis_orbital_specific_band_data_from_PROCAR(path, atom, orbital, ispin)
-                # End of Code updated for soc
-                if i == 0:
-                    if j == 0:
-                        label += r"$tot$" if orbital == tot_ind else orbital_labels[orbital]
-                    else:
-                        label += r"$+$" + orbital_labels[orbital]
-
-        all_procar_data.append(procar_data)
+        if atom_list:
+            label += r"$+$".join(r"$tot$" if orbital == tot_ind else orbital_labels[orbital] for orbital in orbital_list)
+
+        # One reduction over the entry's rows instead of adding the pairs one by one
+        all_procar_data.append(proj_selected[group].sum(axis=0))
         all_labels.append(label)
+
+    # Insert the discontinuity columns once per projection, outside the plotting loops
+    plot_data = [insert_discontinuities(data, discontinuity_indices, plan=disc_plan) for data in all_procar_data]
     
     # ===== Plotting =====
+    custom_handles = [Line2D([0], [0], color=color, marker='o', linestyle="", markersize=5, label=label)
+                      for color, label in zip(color_scheme, all_labels)]
     if ispin == 1:
         fig, ax = plt.subplots(figsize=(params["FIGSIZEX"], params["FIGSIZEY"]), dpi=dpi)
-        custom_handles = []
-        for band in range(bs_selected.shape[0]):
-            ax.plot(x_arr, bs_selected[band], color="black", linewidth=linewidth)
-
-        for i, data in enumerate(all_procar_data):
-            data_k = data[:, idx_selected]
-            #New code for handling discontinuity
-            data_k = insert_discontinuities(data_k, discontinuity_indices)
-            #Code for handling discontinuity ends
-            for band in range(bs_selected.shape[0]):
-                ax.scatter(
-                    x_arr,
-                    bs_selected[band],
-                    s=scale * data_k[band],
-                    alpha=transparency / 100.0,
-                    color=color_scheme[i]
-                )
-            custom_handles.append(Line2D([0], [0], color=color_scheme[i], marker='o', linestyle="", markersize=5, label=all_labels[i]))
-        
+        _plot_spin(ax, x_arr, bs_selected, plot_data, scale, transparency / 100.0, color_scheme, linewidth)
+
         ax.legend(handles=custom_handles, loc=legend_loc, framealpha=0.3)
         ax.set_xticks(tick_vals)
         ax.set_xticklabels(labels)
@@ -232,29 +345,11 @@ def orbscatter(**params):
 
     elif ispin == 2:
         fig, axes = plt.subplots(1, 2, figsize=(params["FIGSIZEX"], params["FIGSIZEY"]), dpi=dpi)
-        custom_handles = []
-
-        # Up spin (left)
-        for band in range(bs_selected[0].shape[0]):
-            axes[0].plot(x_arr, bs_selected[0][band], color="black", linewidth=linewidth)
-
-        # Down spin (right)
-        for band in range(bs_selected[1].shape[0]):
-            axes[1].plot(x_arr, bs_selected[1][band], color="black", linewidth=linewidth)
-
-        for i, data in enumerate(all_procar_data):
-            up_data = data[0][:, idx_selected]
-            down_data = data[1][:, idx_selected]
-            #New code for handling discontinuity
-            up_data = insert_discontinuities(data[0][:, idx_selected], discontinuity_indices)
-            down_data = insert_discontinuities(data[1][:, idx_selected], discontinuity_indices)
-            #Code for handling discontinuity ends
-            for band in range(bs_selected[0].shape[0]):
-                axes[0].scatter(x_arr, bs_selected[0][band], s=scale * up_data[band], alpha=transparency / 100.0, color=color_scheme[i])
-            for band in range(bs_selected[1].shape[0]):
-                axes[1].scatter(x_arr, bs_selected[1][band], s=scale * down_data[band], alpha=transparency / 100.0, color=color_scheme[i])
-
-            custom_handles.append(Line2D([0], [0], color=color_scheme[i], marker='o', linestyle="", markersize=5, label=all_labels[i]))
+
+        # Up spin (left), down spin (right)
+        for spin, ax in enumerate(axes):
+            _plot_spin(ax, x_arr, bs_selected[spin], [data[spin] for data in plot_data],
+                       scale, transparency / 100.0, color_scheme, linewidth)
 
         # Add "↑" and "↓" labels below each subplot
         axes[0].text(0.5, -0.15, "↑", transform=axes[0].transAxes, ha='center', va='top', fontsize=14)
@@ -52,60 +52,55 @@ def clean_kpoints(k_point_array, angle_tolerance_deg=5.0, jump_threshold=0.2, we
         weight_tol (float): Tolerance for weight uniformity check.
 
     Returns:
-        cleaned_kpoints (list of tuples): (index, kx, ky, kz)
-        high_sym_indices (list of int): Indices of high-symmetry points in cleaned_kpoints
+        cleaned_kpoints (np.ndarray): shape (N, 4), rows [index, kx, ky, kz]
+        high_sym_indices (list of int): k-point indices (column 0 of cleaned_kpoints) of the high-symmetry points
     """
 
 
     # Step 1: Determine whether to trim based on weight uniformity
 
     weights = k_point_array[:, 4]
-    if np.all(np.abs(weights - weights[0]) < weight_tol):
+    # Every weight lies within weight_tol of the first exactly when the max and min do; two reductions, no temporaries
+    if weights.size == 0 or (weights.max() - weights[0] < weight_tol and weights[0] - weights.min() < weight_tol):
         band_kpoints = k_point_array  # if all weights are equal , use all
     else:
         band_kpoints = k_point_array[np.abs(weights) < weight_tol]  # Keep only ~zero-weight by making a true false mask based on whether weight is less than tol
 
-    # Step 2: Remove adjacent duplicates (within tolerance)
-    cleaned_kpoints = []
-    prev_k = None
-    for row in band_kpoints:
-        idx, kx, ky, kz, _ = row
-        current_k = np.array([kx, ky, kz])
-        if prev_k is None or not np.allclose(prev_k, current_k, atol=1e-8):
-            cleaned_kpoints.append((int(idx), kx, ky, kz))
-            prev_k = current_k
-    cleaned_kpoints = np.array(cleaned_kpoints)
-
-    # Step 3: Detect direction changes and jumps
-    high_sym_indices = [int(cleaned_kpoints[0][0])]  # Always include first point
-
-
-
-    for i in range(1, len(cleaned_kpoints) - 1):
-        k_prev = cleaned_kpoints[i - 1][1:]
-        k_curr = cleaned_kpoints[i][1:]
-        k_next = cleaned_kpoints[i + 1][1:]
-
-        vec1 = np.array(k_curr) - np.array(k_prev)
-        vec2 = np.array(k_next) - np.array(k_curr)
-
-        angle = angle_between(vec1, vec2)
-        jump = np.linalg.norm(np.array(k_curr) - np.array(k_prev))
-
-        if angle > angle_tolerance_deg or jump > jump_threshold:
-            high_sym_indices.append(int(cleaned_kpoints[i][0]))
-
-    high_sym_indices.append(int(cleaned_kpoints[-1][0]))  # Always include last point  
-
-    # Convert back to numpy array of list of tuples
-    cleaned_kpoints = np.array([tuple(row) for row in cleaned_kpoints])
+    # Step 2: Remove adjacent duplicates (within tolerance). Each point is compared with the last kept
+    # one, which is the point before it unless that one was dropped too: one comparison per point
+    # first, then the points after a dropped one are checked again in order (rarely more than a few)
+    coords = band_kpoints[:, 1:4]
+    close = np.isclose(coords[:-1], coords[1:], atol=1e-8).all(axis=1)
+    keep = np.ones(len(band_kpoints), dtype=bool)
+    keep[1:] = ~close
+    for i in np.flatnonzero(close[:-1]) + 2:
+        last_kept = i - 1
+        while not keep[last_kept]:
+            last_kept -= 1
+        keep[i] = not np.allclose(coords[last_kept], coords[i], atol=1e-8)
+    cleaned_kpoints = band_kpoints[keep, :4]
+
+    # Step 3: Detect direction changes and jumps, for all interior points at once
+    steps = np.diff(cleaned_kpoints[:, 1:4], axis=0)  # steps[i] = k[i + 1] - k[i]
+    step_lengths = np.linalg.norm(steps, axis=1)
+    dots = np.einsum('ij,ij->i', steps[:-1], steps[1:])
+    norm_products = step_lengths[:-1] * step_lengths[1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # A zero-length step counts as no direction change, as in angle_between
+        cos_theta = np.where(norm_products == 0, 1.0, np.clip(dots / norm_products, -1.0, 1.0))
+    angles = np.degrees(np.arccos(cos_theta))
+    is_high_sym = (angles > angle_tolerance_deg) | (step_lengths[:-1] > jump_threshold)
+
+    high_sym_indices = ([int(cleaned_kpoints[0][0])]  # Always include first point
+                        + cleaned_kpoints[1:-1, 0][is_high_sym].astype(int).tolist()
+                        + [int(cleaned_kpoints[-1][0])])  # Always include last point
 
     return cleaned_kpoints, high_sym_indices
 
 
 def dist_bw_two_kpoints(kpt1, kpt2):
-    dist_vector = np.array(kpt1) - np.array(kpt2)
-    return math.sqrt(np.dot(dist_vector, dist_vector))
+    # Scalar helper for a single pair, no arrays; compute_kpoint_distances handles whole paths itself
+    return math.dist(kpt1, kpt2)
 
 
 def compute_kpoint_distances(cleaned_kpoints, x_scale, jump_cutoff=0.25):
@@ -114,7 +109,7 @@ def compute_kpoint_distances(cleaned_kpoints, x_scale, jump_cutoff=0.25):
     Limits abrupt jumps to a defined cutoff to prevent large segments dominating scale.
 
     Parameters:
-        cleaned_kpoints (list of tuples): (index, kx, ky, kz)
+        cleaned_kpoints (np.ndarray or array-like): shape (N, 4), rows [index, kx, ky, kz]
         x_scale (float): Desired total scaled path length.
         jump_cutoff (float): Max allowed segment length before it's clipped.
 
@@ -122,68 +117,64 @@ def compute_kpoint_distances(cleaned_kpoints, x_scale, jump_cutoff=0.25):
         full_data (np.ndarray): [index, segment_distance, cumulative_distance, scaled_distance]
         reduced_data (np.ndarray): [index, scaled_distance]
     """
-    num_kpts = len(cleaned_kpoints)
-
-    segment_dists = [0.0]
-    cumulative_dists = [0.0]
-    raw_dists = [0.0]  # for keeping track
-
-    for i in range(1, num_kpts):
-        _, kx1, ky1, kz1 = cleaned_kpoints[i - 1]
-        _, kx2, ky2, kz2 = cleaned_kpoints[i]
-        d_raw = dist_bw_two_kpoints((kx1, ky1, kz1), (kx2, ky2, kz2))
-        if d_raw>jump_cutoff:
-            d = 0.0
-        else:
-            d = d_raw
-        #d = min(d_raw, jump_cutoff)
-        raw_dists.append(d_raw)
-        segment_dists.append(d)
-        cumulative_dists.append(cumulative_dists[-1] + d)
+    kpoints = np.asarray(cleaned_kpoints, dtype=np.float64)
+    num_kpts = len(kpoints)
+
+    # Columns are written straight into the typed output: index, segment, cumulative and scaled distance
+    full_data = np.empty((num_kpts, 4), dtype=np.float64)
+    full_data[:, 0] = kpoints[:, 0].astype(int)
+
+    # All segment lengths at once; segments longer than jump_cutoff get zero length
+    segment_dists = full_data[:, 1]
+    segment_dists[0] = 0.0
+    segment_dists[1:] = np.linalg.norm(np.diff(kpoints[:, 1:4], axis=0), axis=1)
+    segment_dists[segment_dists > jump_cutoff] = 0.0
+    cumulative_dists = np.cumsum(segment_dists, out=full_data[:, 2])
 
     total_length = cumulative_dists[-1]
 
     if total_length == 0:
-        scaled_dists = cumulative_dists.copy()
+        full_data[:, 3] = cumulative_dists
     else:
-        scaled_dists = [d * (x_scale / total_length) for d in cumulative_dists]
+        np.multiply(cumulative_dists, x_scale / total_length, out=full_data[:, 3])
 
-    indices = [int(row[0]) for row in cleaned_kpoints]
-    full_data = np.array(list(zip(indices, segment_dists, cumulative_dists, scaled_dists)))
-    reduced_data = np.array(list(zip(indices, scaled_dists)))
+    reduced_data = np.empty((num_kpts, 2), dtype=np.float64)
+    reduced_data[:, 0] = full_data[:, 0]
+    reduced_data[:, 1] = full_data[:, 3]
     return full_data, reduced_data
 
 
-def insert_discontinuities(arr, discontinuity_indices):
+def insert_discontinuities(arr, discontinuity_indices, plan=None, return_plan=False):
     """
     Inserts NaN columns into the array at discontinuity positions.
+    The result is allocated once and filled with a single scatter of the original columns.
 
     Parameters:
         arr (np.ndarray): Shape (bands, kpoints) or (2, bands, kpoints) if spin-polarized
-        discontinuity_indices (list or np.ndarray): Positions to insert NaNs
+        discontinuity_indices (list or np.ndarray): Positions to insert NaNs, sorted
+        plan (tuple, optional): (new_cols, width) returned by an earlier call with return_plan=True
+            for arrays with the same number of kpoints; skips recomputing the column positions
+        return_plan (bool): Also return the plan so it can be reused for other arrays
 
     Returns:
         arr_with_nans (np.ndarray): Same shape but with NaNs inserted in kpoint axis
+        plan (tuple): Only if return_plan is True
     """
-    if arr.ndim == 2:
-        parts = np.split(arr, discontinuity_indices, axis=1)
-        with_nans = []
-        for part in parts:
-            with_nans.append(part)
-            with_nans.append(np.full((arr.shape[0], 1), np.nan))
-        return np.concatenate(with_nans[:-1], axis=1)  # drop last dummy
-    elif arr.ndim == 3:
-        out = []
-        for spin in range(arr.shape[0]):
-            parts = np.split(arr[spin], discontinuity_indices, axis=1)
-            with_nans = []
-            for part in parts:
-                with_nans.append(part)
-                with_nans.append(np.full((arr.shape[1], 1), np.nan))
-            out.append(np.concatenate(with_nans[:-1], axis=1))
-        return np.array(out)
-    else:
+    if arr.ndim not in (2, 3):
         raise ValueError("Unsupported array shape in insert_discontinuities")
+    if plan is None:
+        discontinuity_indices = np.asarray(discontinuity_indices, dtype=np.intp)
+        num_cols = arr.shape[-1]
+        # Column j moves right by the number of discontinuities at or before it
+        new_cols = np.arange(num_cols) + np.searchsorted(discontinuity_indices, np.arange(num_cols), side="right")
+        plan = (new_cols, num_cols + len(discontinuity_indices))
+    new_cols, width = plan
+    dtype = arr.dtype if np.issubdtype(arr.dtype, np.floating) else np.float64
+    arr_with_nans = np.full(arr.shape[:-1] + (width,), np.nan, dtype=dtype)
+    arr_with_nans[..., new_cols] = arr
+    if return_plan:
+        return arr_with_nans, plan
+    return arr_with_nans
 
 def merge_close_ticks(tick_vals, tick_labels, tol=1e-5):
     """
@@ -201,24 +192,17 @@ def merge_close_ticks(tick_vals, tick_labels, tol=1e-5):
     if not tick_vals or not tick_labels or len(tick_vals) != len(tick_labels):
         raise ValueError("tick_vals and tick_labels must be same-length non-empty lists.")
 
-    merged_vals = []
-    merged_labels = []
-
-    current_val = tick_vals[0]
-    current_label = tick_labels[0]
-
-    for i in range(1, len(tick_vals)):
-        if abs(tick_vals[i] - current_val) <= tol:
-            current_label += "|" + tick_labels[i]
-        else:
-            merged_vals.append(current_val)
-            merged_labels.append(current_label)
-            current_val = tick_vals[i]
-            current_label = tick_labels[i]
-
-    # Append final
-    merged_vals.append(current_val)
-    merged_labels.append(current_label)
+    # A group runs from its first tick up to the next tick more than tol away from that first one
+    # (not from the tick before it, so a chain of close ticks cannot drift); one vector test per group
+    vals = np.asarray(tick_vals, dtype=np.float64)
+    merged_vals, merged_labels = [], []
+    start = 0
+    while start < len(vals):
+        far = np.flatnonzero(np.abs(vals[start + 1:] - vals[start]) > tol)
+        end = start + 1 + far[0] if far.size else len(vals)
+        merged_vals.append(float(vals[start]))
+        merged_labels.append("|".join(tick_labels[start:end]))
+        start = end
 
     return merged_vals, merged_labels
 
@@ -235,7 +219,33 @@ def get_valid_xlim(x_arr):
     Raises:
         ValueError: If no valid x values are found
     """
-    x_clean = x_arr[~np.isnan(x_arr) & ~np.isinf(x_arr)]
-    if x_clean.size == 0:
+    finite = np.isfinite(x_arr)  # one mask for both NaN and Inf
+    if not finite.any():
         raise ValueError("No valid x-axis values found (all NaN or Inf).")
-    return x_clean.min(), x_clean.max()
+    # Masked reductions, no filtered copy of x_arr
+    return np.min(x_arr, where=finite, initial=np.inf), np.max(x_arr, where=finite, initial=-np.inf)
+
+def flatten_orbital_info(orbital_info):
+    """
+    Flattens ORBITAL_INFO entries ([atom_indices, element, orbital_indices]) into
+    structure-of-arrays form, one row per (atom, orbital) pair in entry order.
+
+    Parameters:
+        orbital_info (list): ORBITAL_INFO entries
+
+    Returns:
+        atoms (np.ndarray of int32): Atom index of every pair
+        orbitals (np.ndarray of int32): Orbital index of every pair
+        groups (np.ndarray of int32): Index of the ORBITAL_INFO entry every pair belongs to
+        group_slices (list of slice): Rows of each entry, e.g. atoms[group_slices[i]]
+    """
+    atoms, orbitals, groups, group_slices = [], [], [], []
+    for group, (atom_list, _, orbital_list) in enumerate(orbital_info):
+        start = len(atoms)
+        for atom in atom_list:
+            atoms.extend([atom] * len(orbital_list))
+            orbitals.extend(orbital_list)
+        groups.extend([group] * (len(atoms) - start))
+        group_slices.append(slice(start, len(atoms)))
+    return (np.asarray(atoms, dtype=np.int32), np.asarray(orbitals, dtype=np.int32),
+            np.asarray(groups, dtype=np.int32), group_slices)
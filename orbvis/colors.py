@@ -0,0 +1,43 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:orbvis/colors.py
+
+Color string normalization shared by the config parser and the band and DOS plotters, so a
+COLOR_SCHEME entry resolves to the same color wherever it is read.
+
+Author: Taradutt Pattnaik
+Created: 2025-06-11
+"""
+import functools
+import re
+
+_HEX_RE = re.compile(r"[0-9A-Fa-f]{3}|[0-9A-Fa-f]{6}")
+
+
+@functools.lru_cache(maxsize=512)
+def normalize_color_str(color):
+    """
+    Normalizes a color string to '#rrggbb' (lowercase, as matplotlib.colors.to_hex returns it).
+    Cached, since the same few colors repeat across COLOR_SCHEME entries, parses and plots.
+
+    Parameters:
+    - color (str): 3- or 6-digit hex code with or without '#', or any matplotlib color name
+
+    Returns:
+    - str: '#rrggbb'; raises ValueError for anything that is not a color
+    """
+    color = color.strip()
+    hex_code = color[1:] if color.startswith('#') else color
+    if _HEX_RE.fullmatch(hex_code):
+        if len(hex_code) == 3:
+            hex_code = ''.join(digit * 2 for digit in hex_code)
+        return '#' + hex_code.lower()
+    # Anything else is a color name; matplotlib is only imported when a name has to be resolved
+    from matplotlib import colors as mcolors
+    return mcolors.to_hex(color)
@@ -13,6 +13,6 @@ Created: 2025-06-11
 """
 
 from .plotter import plot_pdos
-from .parser import read_fermi_energy_streamed,read_total_dos_streamed,read_atom_orbital_dos_streamed
+from .parser import read_fermi_energy_streamed,read_total_dos_streamed,read_atom_orbital_dos_streamed,read_all_pdos_streamed
 
-__all__= ["plot_pdos","read_fermi_energy_streamed","read_total_dos_streamed","read_atom_orbital_dos_streamed"]
\ No newline at end of file
+__all__= ["plot_pdos","read_fermi_energy_streamed","read_total_dos_streamed","read_atom_orbital_dos_streamed","read_all_pdos_streamed"]
\ No newline at end of file
@@ -11,7 +11,36 @@ File name:orbvis/dos/parser.py
 Author: Taradutt Pattnaik
 Created: 2025-06-11
 """
+import io
+import mmap
+from itertools import islice
+
 import numpy as np
+
+
+def _read_block(f, nedos, usecols=None):
+    """
+    Reads the next nedos rows of a DOSCAR block with numpy's C tokenizer instead of
+    splitting and converting every line in Python.
+
+    Parameters:
+    - f: open DOSCAR file positioned at the first row of the block
+    - nedos (int): number of rows in the block
+    - usecols (int or tuple, optional): columns to keep; an int gives a 1D array
+
+    Returns:
+    - np.ndarray of float64, shape (nedos,) for an int usecols, else (nedos, ncols)
+    """
+    return np.loadtxt(f, max_rows=nedos, usecols=usecols, ndmin=1 if isinstance(usecols, int) else 2)
+
+
+def _skip(f, n):
+    """
+    Advances the open file f by n lines in one C-level islice step instead of a Python loop of next(f).
+    """
+    next(islice(f, n, n), None)
+
+
 def read_fermi_energy_streamed(path):
     """
     Efficiently read Fermi energy from DOSCAR using line-by-line parsing.
@@ -21,8 +50,7 @@ def read_fermi_energy_streamed(path):
     """
     print("[orbvis]Orbvis is reading DOSCAR to extract Fermi energy...")
     with open(path, 'r') as f:
-        for _ in range(5):
-            next(f)  # skip first 5 lines
+        _skip(f, 5)  # skip first 5 lines
         line6 = next(f).split()
         E_fermi = float(line6[3])  # 4th val is fermi energy
         print("[orbvis]Fermi energy is "+ str(E_fermi))
@@ -39,29 +67,18 @@ def read_total_dos_streamed(path, ispin):
     """
     print("[orbvis]Orbvis is reading doscar to extract tdos data...")
     with open(path, 'r') as f:
-        for _ in range(5):
-            next(f)
+        _skip(f, 5)
 
         meta = next(f).split()
         nedos = int(meta[2])
 
-        E = []
-        DOS = []
-        
-
         if ispin == 1:
-            for _ in range(nedos):
-                parts = next(f).split()
-                E.append(float(parts[0]))
-                DOS.append(float(parts[1]))
-            return np.array(E), np.array(DOS)
+            block = _read_block(f, nedos, usecols=(0, 1))
+            return block[:, 0], block[:, 1]
 
         elif ispin == 2:
-            for _ in range(nedos):
-                parts = next(f).split()
-                E.append(float(parts[0]))
-                DOS.append([float(parts[1]), float(parts[2])])  # up, down both are appended side by sidea s one entry
-            return np.array(E), np.array(DOS)
+            block = _read_block(f, nedos, usecols=(0, 1, 2))
+            return block[:, 0], block[:, 1:]  # up, down side by side as one entry
 
         else:
             raise ValueError("ispin must be 1 or 2.")
@@ -75,38 +92,25 @@ def read_atom_orbital_dos_streamed(path, ispin, atom_index, orbital_index):
     """
     print("[orbvis]Orbvis is reading doscar to extract atom "+str(atom_index)+"'s orbital "+str(orbital_index)+"'s pdos data...")
     with open(path, 'r') as f:
-        for _ in range(5):
-            next(f)
+        _skip(f, 5)
 
         meta = next(f).split()
         nedos = int(meta[2])
 
         # Skip total DOS block
-        for _ in range(nedos):
-            next(f)
+        _skip(f, nedos)
 
         # Skip previous atoms' PDOS blocks
         block_size = 1 + nedos  # 1 metadata + nedos lines
-        for _ in range(atom_index * block_size):
-            next(f)
+        _skip(f, atom_index * block_size)
 
         next(f)  # skip current atom blocks metadata line
 
         if ispin == 1:
-            dos = []
-            for _ in range(nedos):
-                parts = next(f).split()
-                dos.append(float(parts[1 + orbital_index]))
-            return np.array(dos)
+            return _read_block(f, nedos, usecols=1 + orbital_index)
 
         elif ispin == 2:
-            dos = []
-            for _ in range(nedos):
-                parts = next(f).split()
-                up = float(parts[1 + 2 * orbital_index])
-                down = float(parts[2 + 2 * orbital_index])
-                dos.append([up, down])
-            return np.array(dos)
+            return _read_block(f, nedos, usecols=(1 + 2 * orbital_index, 2 + 2 * orbital_index))  # up, down
 
         else:
             raise ValueError("ispin must be 1 or 2.")
@@ -121,21 +125,13 @@ def read_total_dos_streamed_soc(path):
     """
     print("[orbvis]Orbvis is reading doscar (SOC mode) to extract tdos data...")
     with open(path, 'r') as f:
-        for _ in range(5):
-            next(f)
+        _skip(f, 5)
 
         meta = next(f).split()
         nedos = int(meta[2])
 
-        E = []
-        DOS = []
-
-        for _ in range(nedos):
-            parts = next(f).split()
-            E.append(float(parts[0]))
-            DOS.append(float(parts[1]))  # Only the total DOS (no up/down split)
-
-        return np.array(E), np.array(DOS)
+        block = _read_block(f, nedos, usecols=(0, 1))  # Only the total DOS (no up/down split)
+        return block[:, 0], block[:, 1]
 
 def read_atom_orbital_dos_streamed_soc(path, atom_index, orbital_index):
     """
@@ -147,30 +143,74 @@ def read_atom_orbital_dos_streamed_soc(path, atom_index, orbital_index):
     print(f"[orbvis]Orbvis is reading doscar (SOC mode) to extract atom {atom_index}'s orbital {orbital_index}'s pdos data...")
 
     with open(path, 'r') as f:
-        for _ in range(5):
-            next(f)
+        _skip(f, 5)
 
         meta = next(f).split()
         nedos = int(meta[2])
 
         # Skip total DOS block
-        for _ in range(nedos):
-            next(f)
+        _skip(f, nedos)
 
         # Each atom's PDOS block: 1 header + nedos lines
         block_size = 1 + nedos
-        skip_lines = atom_index * block_size
-
-        for _ in range(skip_lines):
-            next(f)
+        _skip(f, atom_index * block_size)
 
         next(f)  # skip atom metadata line
 
-        dos = []
         col = 1 + 4 * orbital_index  # total, mx, my, mz → each orbital has 4 columns
+        return _read_block(f, nedos, usecols=col)
+
+
+def read_all_pdos_streamed(path, ispin, soc=False, atoms=None):
+    """
+    Reads the total DOS and the PDOS blocks of several atoms from DOSCAR in one pass, so plotting
+    several atom/orbital combinations does not reopen and re-skip the file for each of them.
+    Only the blocks of the requested atoms are parsed; the others are skipped by line offset.
 
-        for _ in range(nedos):
-            parts = next(f).split()
-            dos.append(float(parts[col]))
+    Parameters:
+    - path (str): Path to DOSCAR
+    - ispin (int): 1 or 2 (ignored when soc is True)
+    - soc (bool): DOSCAR from a non-collinear (SOC) calculation
+    - atoms (sequence of int, optional): atom indices (starting from 0) to read; all atoms if None
+
+    Returns:
+    - E (nedos,): energy array
+    - DOS: total DOS, as read_total_dos_streamed (or read_total_dos_streamed_soc)
+    - pdos (len(atoms), nedos, ncols): columns of each requested atom's PDOS block without the
+        energy column, in the order of atoms. Orbital j is column j for ispin=1, columns 2j (up)
+        and 2j+1 (down) for ispin=2 and column 4j (total of total, mx, my, mz) for SOC
+    """
+    print("[orbvis]Orbvis is reading doscar to extract tdos and pdos data...")
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Start offset of every line, found in one vectorized pass over the mapped bytes
+        # (the end of the file is appended in case the last line has no newline)
+        newlines = np.flatnonzero(np.frombuffer(mm, dtype=np.uint8) == ord("\n"))
+        line_starts = np.concatenate(([0], newlines + 1, [len(mm)]))
+
+        natoms = int(mm[:line_starts[1]].split()[0])  # first header value is the number of ions
+        nedos = int(mm[line_starts[5]:line_starts[6]].split()[2])
+
+        def read_rows(first_line):
+            # nedos rows as one byte slice, tokenized by numpy's C reader (faster here than np.fromstring)
+            return np.loadtxt(io.BytesIO(mm[line_starts[first_line]:line_starts[first_line + nedos]]), ndmin=2)
+
+        block = read_rows(6)
+        if soc or ispin == 1:
+            E, DOS = block[:, 0], block[:, 1]  # SOC: only the total DOS (no up/down split)
+        elif ispin == 2:
+            E, DOS = block[:, 0], block[:, 1:3]  # up, down side by side as one entry
+        else:
+            raise ValueError("ispin must be 1 or 2.")
 
-        return np.array(dos)
\ No newline at end of file
+        # Atom a's block is a metadata line followed by nedos rows
+        atoms = range(natoms) if atoms is None else [int(a) for a in atoms]
+        for a in atoms:
+            if not 0 <= a < natoms:
+                raise ValueError(f"Atom index {a} is out of range for {natoms} atoms.")
+        first_row = 7 + nedos
+        ncols = len(mm[line_starts[first_row]:line_starts[first_row + 1]].split()) - 1
+        pdos = np.empty((len(atoms), nedos, ncols))
+        for i, a in enumerate(atoms):
+            pdos[i] = read_rows(first_row + a * (nedos + 1))[:, 1:]
+        print("[orbvis]Orbvis is done reading doscar")
+        return E, DOS, pdos
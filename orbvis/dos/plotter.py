@@ -15,10 +15,7 @@ import numpy as np
 
 from .parser import (
     read_fermi_energy_streamed,
-    read_total_dos_streamed,
-    read_atom_orbital_dos_streamed,
-    read_total_dos_streamed_soc,
-    read_atom_orbital_dos_streamed_soc,
+    read_all_pdos_streamed,
 )
 
 import numpy as np
@@ -30,7 +27,7 @@ from .utils import (
 )
 from distinctipy import get_colors, get_hex
 import matplotlib.colors as mcolors
-import matplotlib.cm as cm
+from matplotlib import colormaps
 
 def plot_pdos(**params):
     # ====== Extract parameters =====
@@ -69,8 +66,10 @@ def plot_pdos(**params):
             color_scheme = color_scheme[:num_cases]
     elif isinstance(color_scheme, str):
         try:
-            cmap = cm.get_cmap(color_scheme)
-            color_scheme = [mcolors.to_hex(cmap(i / max(1, num_cases - 1))) for i in range(num_cases)]
+            cmap = colormaps[color_scheme]
+            # One colormap lookup for all cases, sampled at the same positions i / max(1, num_cases - 1)
+            rgba = cmap(np.arange(num_cases) / max(1, num_cases - 1))
+            color_scheme = [mcolors.to_hex(c) for c in rgba]
         except Exception:
             raise ValueError(f"Invalid colormap name: {color_scheme}")
     elif isinstance(color_scheme, int):
@@ -84,13 +83,10 @@ def plot_pdos(**params):
         raise ValueError("Invalid COLOR_SCHEME format.")
 
     # ===== Read DOS data =====
-    # Start of Code updated for soc
-    #energy_arr, tdos = read_total_dos_streamed(path, ispin)
-    if soc:
-        energy_arr, tdos = read_total_dos_streamed_soc(path)
-    else:
-        energy_arr, tdos = read_total_dos_streamed(path, ispin)
-    # End of Code updated for soc
+    # The total DOS and the PDOS blocks of the atoms named in ORBITAL_INFO are read in one pass;
+    # row i of pdos_sel is atom atoms[i], and the sums below only index pdos_sel
+    atoms = np.unique(np.fromiter((atom for entry in data for atom in entry[0]), dtype=int))
+    energy_arr, tdos, pdos_sel = read_all_pdos_streamed(path, ispin, soc, atoms=atoms)
     
 
     #if efermi is None: overwrites the value from config file
@@ -99,57 +95,61 @@ def plot_pdos(**params):
     #print(f"[DEBUG] Energy min/max (before shift): {energy_arr.min()} to {energy_arr.max()}")
     energy_arr = energy_arr - efermi
     #print(f"[DEBUG] Energy min/max (after shift): {energy_arr.min()} to {energy_arr.max()}")
-    all_pdos_data = []
     all_labels = []
 
-    for entry in data:
+    # Row 0 is the TDOS, row i + 1 the i-th ORBITAL_INFO entry (with a trailing up/down axis for ISPIN=2).
+    # Every row is written in place; the block is C-contiguous float32, half the memory traffic of float64
+    # for the smoothing below and far below plot resolution
+    traces = np.empty((num_cases + 1,) + tdos.shape, dtype=np.float32)
+    traces[0] = tdos
+
+    for k, entry in enumerate(data):
         atom_list, element_name, orbital_list = entry
         label = element_name
-        pdos_data = np.zeros_like(tdos)
-
-        for i, atom in enumerate(atom_list):
-            for j, orb in enumerate(orbital_list):
-                # Start of Code updated for soc
-                #pdos_data += read_atom_orbital_dos_streamed(path, ispin, atom, orb)
-                if soc:
-                    pdos_data += read_atom_orbital_dos_streamed_soc(path, atom, orb)
-                else:
-                    pdos_data += read_atom_orbital_dos_streamed(path, ispin, atom, orb)
-                 # End of Code updated for soc
-                if i == 0:
-                    if j == 0:
-                        label += orbital_labels[int(orb)]
-                    else:
-                        label += r"$+$" + orbital_labels[int(orb)]
-
-        all_pdos_data.append(pdos_data)
+        if atom_list:
+            label += r"$+$".join(orbital_labels[int(orb)] for orb in orbital_list)
+
+        # Columns of each orbital in an atom's PDOS block: 4j for SOC (total of total, mx, my, mz),
+        # j for ISPIN=1, (2j, 2j + 1) = (up, down) for ISPIN=2
+        orbitals = np.asarray(orbital_list, dtype=int)
+        if soc:
+            cols = 4 * orbitals
+        elif ispin == 1:
+            cols = orbitals
+        else:
+            cols = np.stack([2 * orbitals, 2 * orbitals + 1], axis=-1)
+        # One gather and one reduction over all (atom, orbital) pairs of the entry, accumulated in float64
+        rows = np.searchsorted(atoms, np.asarray(atom_list, dtype=int))
+        pdos_sel[rows][:, :, cols].sum(axis=(0, 2), dtype=np.float64, out=traces[k + 1])
+
         all_labels.append(label)
 
+    # ===== Smoothing =====
+    # TDOS and every PDOS trace are smoothed by one gaussian_filter1d call along the energy axis
+    smoothed = gaussian_filter1d(traces, sigma=sigma, axis=1)
+    tdos_smooth, all_pdos_smooth = smoothed[0], smoothed[1:]
+
     # ===== Plotting ======
     fig, ax = plt.subplots(figsize=(figsize_x, figsize_y), dpi=dpi)
 
     if soc or ispin == 1:
         
         if show_tdos:
-            tdos_smooth = gaussian_filter1d(tdos, sigma=sigma)
             ax.plot(energy_arr, tdos_smooth, label="TDOS", color="black", linewidth=tdos_lw)
 
 
-        for i, pdos in enumerate(all_pdos_data):
-            pdos_smooth = gaussian_filter1d(pdos, sigma=sigma)
+        for i, pdos_smooth in enumerate(all_pdos_smooth):
             ax.plot(energy_arr, pdos_smooth, label=all_labels[i],
                     color=color_scheme[i], linewidth=pdos_lw, alpha=transparency)
 
     elif ispin == 2:
         if show_tdos:
-            up_tdos = gaussian_filter1d(tdos[:, 0], sigma=sigma)
-            down_tdos = gaussian_filter1d(tdos[:, 1], sigma=sigma)
+            up_tdos, down_tdos = tdos_smooth[:, 0], tdos_smooth[:, 1]
             ax.plot(energy_arr, up_tdos, label="TDOS ", color="black", linewidth=tdos_lw)
             ax.plot(energy_arr, -down_tdos, color="black", linewidth=tdos_lw)
 
-        for i, pdos in enumerate(all_pdos_data):
-            up = gaussian_filter1d(pdos[:, 0], sigma=sigma)
-            down = gaussian_filter1d(pdos[:, 1], sigma=sigma)
+        for i, pdos_smooth in enumerate(all_pdos_smooth):
+            up, down = pdos_smooth[:, 0], pdos_smooth[:, 1]
             ax.plot(energy_arr, up, label=all_labels[i],
                     color=color_scheme[i], linewidth=pdos_lw, alpha=transparency)
             ax.plot(energy_arr, -down, color=color_scheme[i], linewidth=pdos_lw, alpha=transparency)
@@ -11,21 +11,17 @@ File name:orbvis/dos/utils.py
 Author: Taradutt Pattnaik
 Created: 2025-06-11
 """
-import matplotlib.colors as mcolors
+from ..colors import normalize_color_str
 
 def normalize_color(color):
     """
     Normalize hex color (with or without '#') or named color to hex.
     """
+    if not isinstance(color, str):
+        raise ValueError(f"Invalid color format: {color}")
     try:
-        if isinstance(color, str):
-            color = color.strip()
-            if not color.startswith("#") and len(color) in [6, 3]:
-                color = "#" + color
-            return mcolors.to_hex(color)
-        else:
-            raise ValueError
-    except Exception:
+        return normalize_color_str(color)
+    except ValueError:
         raise ValueError(f"Invalid color format: {color}")
 orbital_labels = {
     0:  r"$s$",
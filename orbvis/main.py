@@ -16,7 +16,7 @@ from orbvis.band.parser import VASPStyleParser
 from orbvis.band.plotter import orbscatter  # 
 from orbvis.dos.plotter import plot_pdos
 
-def run_from_config(config_path):
+def run_from_config(config_path, cache=True):
     parser = VASPStyleParser(config_path)
     params = parser.as_dict()
     print("[INFO] Parsed parameters:", params)
@@ -27,7 +27,7 @@ def run_from_config(config_path):
         plot_pdos(**params)
 
     elif mode == "band":
-        orbscatter(**params)
+        orbscatter(cache=cache, **params)
 
     else:
         raise ValueError(f"Unknown mode: '{mode}'. Must be 'band' or 'dos'.")
@@ -41,9 +41,14 @@ def main():
         type=str,
         help="Path to the configuration file (.txt)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse the PROCAR again instead of reusing/storing the parsed arrays in the cache directory",
+    )
 
     args = parser.parse_args()
-    run_from_config(args.config)
+    run_from_config(args.config, cache=not args.no_cache)
 
 if __name__ == "__main__":
     main()
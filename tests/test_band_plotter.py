@@ -0,0 +1,39 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:tests/test_band_plotter.py
+
+The bare PathCollection scatter of the band plotter against ax.scatter.
+"""
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from orbvis.band.plotter import _scatter
+
+
+def test_scatter_matches_ax_scatter():
+    xs, ys, sizes = np.arange(5.0), np.linspace(-1, 1, 5), np.array([1.0, 5.0, 20.0, 0.5, 8.0])
+    # Distinct widths, so the test tells which one a filled marker uses
+    with matplotlib.rc_context({"patch.linewidth": 0.3, "lines.linewidth": 2.5}):
+        fig, ax = plt.subplots()
+        expected = ax.scatter(xs, ys, s=sizes, color="#2a9d8f", alpha=0.7, rasterized=True)
+        got = _scatter(ax, xs, ys, sizes, "#2a9d8f", 0.7)
+    try:
+        np.testing.assert_array_equal(got.get_linewidths(), expected.get_linewidths())
+        np.testing.assert_array_equal(got.get_sizes(), expected.get_sizes())
+        np.testing.assert_array_equal(got.get_offsets(), expected.get_offsets())
+        np.testing.assert_array_equal(got.get_facecolors(), expected.get_facecolors())
+        np.testing.assert_array_equal(got.get_edgecolors(), expected.get_edgecolors())
+        assert got.get_alpha() == expected.get_alpha()
+        assert got.get_rasterized() and expected.get_rasterized()
+    finally:
+        plt.close(fig)
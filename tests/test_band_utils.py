@@ -0,0 +1,299 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:tests/test_band_utils.py
+
+The numpy k-path helpers of orbvis.band.utils against the per-point loops they replaced,
+on the k-point lists of the bundled examples and on small synthetic paths.
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from orbvis.band import utils
+from orbvis.band.parser import ProcarReader
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+EXAMPLE_NAMES = ["MoS2_ispin1_hse", "WS2_ispin2_hse", "Bi2Se3_SOC", "Si_ispin1_pbe"]
+
+
+def _example_klist(name):
+    with ProcarReader(EXAMPLES / name / "PROCAR") as procar:
+        return procar.read_klist()
+
+
+def _path(*corners, n=5, weight=0.0):
+    # Straight segments of n points between consecutive corners, as [index, kx, ky, kz, weight] rows
+    segments = [np.linspace(a, b, n) for a, b in zip(corners[:-1], corners[1:])]
+    coords = np.concatenate(segments)
+    return np.column_stack([np.arange(len(coords)), coords, np.full(len(coords), weight)])
+
+
+# Gamma-X-M with X repeated at the corner, then a jump from M to a segment ending at Gamma
+SYNTHETIC = _path((0, 0, 0), (0.5, 0, 0), (0.5, 0.5, 0), n=6)
+SYNTHETIC = np.vstack([SYNTHETIC, _path((0.1, 0.3, 0), (0, 0, 0))])
+SYNTHETIC[:, 0] = np.arange(len(SYNTHETIC))
+
+
+def _clean_kpoints_loop(k_point_array, angle_tolerance_deg=5.0, jump_threshold=0.2, weight_tol=1e-3):
+    weights = k_point_array[:, 4]
+    if np.all(np.abs(weights - weights[0]) < weight_tol):
+        band_kpoints = k_point_array
+    else:
+        band_kpoints = k_point_array[np.abs(weights) < weight_tol]
+
+    cleaned_kpoints = []
+    prev_k = None
+    for row in band_kpoints:
+        idx, kx, ky, kz, _ = row
+        current_k = np.array([kx, ky, kz])
+        if prev_k is None or not np.allclose(prev_k, current_k, atol=1e-8):
+            cleaned_kpoints.append((int(idx), kx, ky, kz))
+            prev_k = current_k
+    cleaned_kpoints = np.array(cleaned_kpoints)
+
+    high_sym_indices = [int(cleaned_kpoints[0][0])]
+    for i in range(1, len(cleaned_kpoints) - 1):
+        k_prev = cleaned_kpoints[i - 1][1:]
+        k_curr = cleaned_kpoints[i][1:]
+        k_next = cleaned_kpoints[i + 1][1:]
+        angle = utils.angle_between(k_curr - k_prev, k_next - k_curr)
+        jump = np.linalg.norm(k_curr - k_prev)
+        if angle > angle_tolerance_deg or jump > jump_threshold:
+            high_sym_indices.append(int(cleaned_kpoints[i][0]))
+    high_sym_indices.append(int(cleaned_kpoints[-1][0]))
+    return cleaned_kpoints, high_sym_indices
+
+
+def _assert_same_cleaning(k_point_array, **kwargs):
+    cleaned, high_sym = utils.clean_kpoints(k_point_array, **kwargs)
+    expected_cleaned, expected_high_sym = _clean_kpoints_loop(k_point_array, **kwargs)
+    np.testing.assert_array_equal(cleaned, expected_cleaned)
+    assert high_sym == expected_high_sym
+
+
+@pytest.mark.parametrize("name", EXAMPLE_NAMES)
+def test_clean_kpoints_matches_loop_on_examples(name):
+    _assert_same_cleaning(_example_klist(name))
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"angle_tolerance_deg": 50.0}, {"jump_threshold": 0.01}])
+def test_clean_kpoints_matches_loop_on_synthetic_path(kwargs):
+    _assert_same_cleaning(SYNTHETIC, **kwargs)
+
+
+def test_clean_kpoints_high_symmetry_points():
+    cleaned, high_sym = utils.clean_kpoints(SYNTHETIC)
+    # Start, the X corner (its repeated copy 6 is dropped), M where the path turns, the first
+    # point after the jump away from M, and the end
+    assert high_sym == [0, 5, 11, 12, 16]
+    assert 6 not in cleaned[:, 0]
+
+
+@pytest.mark.parametrize("coords", [
+    # Repeated corner points, as VASP writes them at every segment boundary
+    [(0, 0, 0), (0, 0, 0), (0.5, 0, 0), (0.5, 0, 0), (0.5, 0, 0), (0.5, 0.5, 0)],
+    # Each point within tolerance of the one before it, but the third not of the first kept one
+    [(0, 0, 0), (0.6e-8, 0, 0), (1.2e-8, 0, 0), (1.8e-8, 0, 0), (0.5, 0, 0)],
+    # The third point is far from the second (dropped) one, but within tolerance of the first
+    [(0, 0, 0), (0.9e-8, 0, 0), (-0.9e-8, 0, 0), (0.5, 0, 0)],
+    # Within the relative tolerance of the later point only
+    [(1.0, 0, 0), (1.0 + 1.00100005e-5, 0, 0), (0.5, 0, 0)],
+])
+def test_clean_kpoints_drops_duplicates_like_loop(coords):
+    k_point_array = np.column_stack([np.arange(len(coords)), np.array(coords, dtype=float), np.zeros(len(coords))])
+    _assert_same_cleaning(k_point_array)
+
+
+@pytest.mark.parametrize("weights", [
+    [0.05] * 6,                                    # uniform: every point is kept
+    [0.0, 0.0009, -0.0009, 0.0, 0.0005, 0.0],      # within weight_tol of the first weight, either side
+    [0.0009, 0.0018, 0.0, 0.0009, 0.0009, 0.0],    # spread nearly 2 * weight_tol, still uniform
+    [0.25, 0.25, 0.0, 0.0, 0.0, 0.0],              # SCF points first: only the zero-weight ones are kept
+    [0.0, 0.0, 0.0, 0.0, 0.0, 0.0011],             # one point just outside weight_tol
+])
+def test_clean_kpoints_weight_check_matches_loop(weights):
+    k_point_array = _path((0, 0, 0), (0.5, 0, 0), n=6)
+    k_point_array[:, 4] = weights
+    _assert_same_cleaning(k_point_array)
+
+
+def _compute_kpoint_distances_loop(cleaned_kpoints, x_scale, jump_cutoff=0.25):
+    segment_dists, cumulative_dists = [0.0], [0.0]
+    for i in range(1, len(cleaned_kpoints)):
+        d_raw = utils.dist_bw_two_kpoints(cleaned_kpoints[i - 1][1:], cleaned_kpoints[i][1:])
+        d = 0.0 if d_raw > jump_cutoff else d_raw
+        segment_dists.append(d)
+        cumulative_dists.append(cumulative_dists[-1] + d)
+
+    total_length = cumulative_dists[-1]
+    if total_length == 0:
+        scaled_dists = cumulative_dists.copy()
+    else:
+        scaled_dists = [d * (x_scale / total_length) for d in cumulative_dists]
+
+    indices = [int(row[0]) for row in cleaned_kpoints]
+    full_data = np.array(list(zip(indices, segment_dists, cumulative_dists, scaled_dists)))
+    reduced_data = np.array(list(zip(indices, scaled_dists)))
+    return full_data, reduced_data
+
+
+def _assert_same_distances(cleaned_kpoints, x_scale, **kwargs):
+    full_data, reduced_data = utils.compute_kpoint_distances(cleaned_kpoints, x_scale, **kwargs)
+    expected_full, expected_reduced = _compute_kpoint_distances_loop(cleaned_kpoints, x_scale, **kwargs)
+    # Whole-array norms and cumsum may round the last bit differently from the scalar loop
+    np.testing.assert_allclose(full_data, expected_full, rtol=1e-13, atol=0)
+    np.testing.assert_allclose(reduced_data, expected_reduced, rtol=1e-13, atol=0)
+
+
+@pytest.mark.parametrize("name", EXAMPLE_NAMES)
+def test_kpoint_distances_match_loop_on_examples(name):
+    cleaned, _ = utils.clean_kpoints(_example_klist(name))
+    _assert_same_distances(cleaned, 10.0)
+
+
+# The default cuts the jump from M, 0.09 also the segments ending at Gamma, 1.0 nothing
+@pytest.mark.parametrize("kwargs", [{}, {"jump_cutoff": 0.09}, {"jump_cutoff": 1.0}])
+def test_kpoint_distances_match_loop_on_synthetic_path(kwargs):
+    cleaned, _ = utils.clean_kpoints(SYNTHETIC)
+    _assert_same_distances(cleaned, 7.5, **kwargs)
+
+
+def test_kpoint_distance_tables_share_columns():
+    cleaned, _ = utils.clean_kpoints(_example_klist("Si_ispin1_pbe"))
+    full_data, reduced_data = utils.compute_kpoint_distances(cleaned, 10.0)
+    assert full_data.shape == (len(cleaned), 4) and reduced_data.shape == (len(cleaned), 2)
+    np.testing.assert_array_equal(reduced_data, full_data[:, [0, 3]])
+    np.testing.assert_array_equal(full_data[:, 0], cleaned[:, 0])
+
+
+def test_kpoint_distances_accept_row_lists():
+    # Rows as the tuples the loop version of clean_kpoints returned; typed float64 output either way
+    rows = [(0, 0.0, 0.0, 0.0), (1, 0.1, 0.0, 0.0), (2, 0.2, 0.0, 0.0), (3, 0.2, 0.1, 0.0)]
+    full_data, reduced_data = utils.compute_kpoint_distances(rows, 3.0)
+    assert full_data.dtype == reduced_data.dtype == np.float64
+    np.testing.assert_array_equal(full_data, utils.compute_kpoint_distances(np.array(rows), 3.0)[0])
+    _assert_same_distances(rows, 3.0)
+
+
+def test_kpoint_distances_of_a_path_without_length():
+    # Every segment is cut, so the scaled distances stay the (zero) cumulative ones
+    rows = np.array([(0, 0.0, 0.0, 0.0), (1, 0.5, 0.0, 0.0), (2, 1.0, 0.0, 0.0)])
+    full_data, reduced_data = utils.compute_kpoint_distances(rows, 3.0)
+    assert not full_data[:, 1:].any() and not reduced_data[:, 1].any()
+    _assert_same_distances(rows, 3.0)
+
+
+def _merge_close_ticks_loop(tick_vals, tick_labels, tol=1e-5):
+    merged_vals, merged_labels = [], []
+    current_val, current_label = tick_vals[0], tick_labels[0]
+    for val, label in zip(tick_vals[1:], tick_labels[1:]):
+        if abs(val - current_val) <= tol:
+            current_label += "|" + label
+        else:
+            merged_vals.append(current_val)
+            merged_labels.append(current_label)
+            current_val, current_label = val, label
+    merged_vals.append(current_val)
+    merged_labels.append(current_label)
+    return merged_vals, merged_labels
+
+
+@pytest.mark.parametrize("tick_vals", [
+    [0.0, 1.0, 1.0, 2.5, 4.0],
+    [0.0, 1.0, 1.000005, 1.00001, 1.000015, 2.0],  # a chain of close ticks spanning more than tol
+    [0.0, 0.5, 0.5 + 1e-5, 3.0],                   # exactly tol apart
+    [2.0, 2.0, 2.0],
+    [1.0],
+])
+def test_merge_close_ticks_matches_loop(tick_vals):
+    tick_labels = [chr(ord("A") + i) for i in range(len(tick_vals))]
+    merged = utils.merge_close_ticks(tick_vals, tick_labels)
+    assert merged == _merge_close_ticks_loop(tick_vals, tick_labels)
+
+
+def test_merge_close_ticks_rejects_mismatched_lists():
+    for tick_vals, tick_labels in [([], []), ([0.0, 1.0], ["A"])]:
+        with pytest.raises(ValueError):
+            utils.merge_close_ticks(tick_vals, tick_labels)
+
+
+@pytest.mark.parametrize("x_arr", [
+    np.array([0.0, 1.5, np.nan, 1.5, 3.0, np.nan, 4.25]),
+    np.array([np.inf, -2.0, np.nan, 7.0, -np.inf]),
+    np.array([np.nan, 5.0]),
+    np.array([-1.0, 2.0, np.nan], dtype=np.float32),
+])
+def test_valid_xlim_matches_filtered_copy(x_arr):
+    x_clean = x_arr[~np.isnan(x_arr) & ~np.isinf(x_arr)]
+    assert utils.get_valid_xlim(x_arr) == (x_clean.min(), x_clean.max())
+
+
+@pytest.mark.parametrize("x_arr", [np.array([np.nan, np.inf, -np.inf]), np.array([])])
+def test_valid_xlim_without_finite_values(x_arr):
+    with pytest.raises(ValueError, match="No valid x-axis values"):
+        utils.get_valid_xlim(x_arr)
+
+
+def _insert_discontinuities_loop(arr, discontinuity_indices):
+    def with_nans(block):
+        parts = np.split(block, discontinuity_indices, axis=1)
+        pieces = []
+        for part in parts:
+            pieces += [part, np.full((block.shape[0], 1), np.nan)]
+        return np.concatenate(pieces[:-1], axis=1)
+
+    if arr.ndim == 2:
+        return with_nans(arr)
+    return np.array([with_nans(block) for block in arr])
+
+
+DISCONTINUITIES = [[], [4], [0, 3, 3, 7], [2, 9]]
+
+
+@pytest.mark.parametrize("discontinuity_indices", DISCONTINUITIES)
+@pytest.mark.parametrize("shape, dtype", [((3, 9), np.float64), ((2, 3, 9), np.float32), ((3, 9), np.int64)])
+def test_insert_discontinuities_matches_split_and_concatenate(shape, dtype, discontinuity_indices):
+    arr = np.arange(np.prod(shape)).reshape(shape).astype(dtype)
+    got = utils.insert_discontinuities(arr, discontinuity_indices)
+    # Float input keeps its dtype; anything else becomes float64 to hold the NaNs
+    assert got.dtype == (arr.dtype if np.issubdtype(dtype, np.floating) else np.float64)
+    np.testing.assert_array_equal(got, _insert_discontinuities_loop(arr, discontinuity_indices))
+
+
+def test_insert_discontinuities_rejects_other_shapes():
+    with pytest.raises(ValueError):
+        utils.insert_discontinuities(np.zeros(5), [2])
+
+
+@pytest.mark.parametrize("discontinuity_indices", DISCONTINUITIES)
+def test_insert_discontinuities_plan_is_reusable(discontinuity_indices):
+    bands = np.arange(27.0).reshape(3, 9)
+    weights = np.linspace(0, 1, 54).reshape(2, 3, 9)
+    expected, plan = utils.insert_discontinuities(bands, discontinuity_indices, return_plan=True)
+    np.testing.assert_array_equal(expected, utils.insert_discontinuities(bands, discontinuity_indices))
+    # The plan fixes the positions only, so it applies to any array with the same k-points
+    np.testing.assert_array_equal(utils.insert_discontinuities(weights, None, plan=plan),
+                                  utils.insert_discontinuities(weights, discontinuity_indices))
+
+
+@pytest.mark.parametrize("orbital_info", [
+    [[[0], "Mo", [4, 5, 7, 6, 8]], [[1, 2], "S", [3, 1, 2]]],
+    [[[0, 1], "Bi", [2]], [[], "none", [1]], [[2, 3, 4], "Se", []]],
+    [],
+])
+def test_flatten_orbital_info(orbital_info):
+    atoms, orbitals, groups, group_slices = utils.flatten_orbital_info(orbital_info)
+    pairs = [(atom, orbital, group) for group, (atom_list, _, orbital_list) in enumerate(orbital_info)
+             for atom in atom_list for orbital in orbital_list]
+    assert list(zip(atoms.tolist(), orbitals.tolist(), groups.tolist())) == pairs
+    assert atoms.dtype == orbitals.dtype == groups.dtype == np.int32
+    assert len(group_slices) == len(orbital_info)
+    for group, rows in enumerate(group_slices):
+        assert (groups[rows] == group).all() and np.count_nonzero(groups == group) == len(groups[rows])
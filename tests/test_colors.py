@@ -0,0 +1,49 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:tests/test_colors.py
+
+The shared color normalization, and that the config parser and both plotters use it alike.
+"""
+import pytest
+
+from orbvis.band.parser import VASPStyleParser
+from orbvis.colors import normalize_color_str
+from orbvis.dos.utils import normalize_color
+
+
+@pytest.mark.parametrize("color, expected", [
+    ("E9C46A", "#e9c46a"),
+    ("#E9C46A", "#e9c46a"),
+    (" e9c46a ", "#e9c46a"),
+    ("abc", "#aabbcc"),
+    ("#ABC", "#aabbcc"),
+    ("red", "#ff0000"),
+    ("orange", "#ffa500"),
+    ("tab:blue", "#1f77b4"),
+])
+def test_normalize_color_str(color, expected):
+    assert normalize_color_str(color) == expected
+
+
+@pytest.mark.parametrize("color", ["gggggg", "#12345", "not-a-color"])
+def test_normalize_color_str_rejects(color):
+    with pytest.raises(ValueError):
+        normalize_color_str(color)
+
+
+@pytest.mark.parametrize("color", ["E9C46A", "#abc", "red", "C1"])
+def test_band_and_dos_normalize_alike(color):
+    parsed = VASPStyleParser.from_dict({"PROCAR_PATH": "PROCAR", "ISPIN": 1, "ORBITAL_INFO": []})._normalize_color(color)
+    assert parsed == normalize_color(color) == normalize_color_str(color)
+
+
+@pytest.mark.parametrize("color", [None, ["red"], (1, 0, 0)])
+def test_dos_normalize_color_rejects_non_strings(color):
+    with pytest.raises(ValueError):
+        normalize_color(color)
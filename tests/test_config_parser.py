@@ -0,0 +1,171 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:tests/test_config_parser.py
+
+The regex ORBITAL_INFO/COLOR_SCHEME parsers against ast.literal_eval, and VASPStyleParser
+on whole config files.
+"""
+import ast
+import os
+
+import pytest
+
+from orbvis.band import parser
+from orbvis.band.parser import VASPStyleParser
+
+
+@pytest.mark.parametrize("text", [
+    '[[[0], "Mo",[4,5,7,6,8]],[[1,2], "S", [3,1,2]]]',
+    "[[[0, 1], 'Bi', [1, 2, 3]]]",
+    '[ [ [ 0 ] , "W" , [ 9 ] ] , ]',
+    '[[[], "none", []]]',
+    '[]',
+])
+def test_orbital_info_matches_literal_eval(text):
+    assert parser._parse_orbital_info(text) == [list(entry) for entry in ast.literal_eval(text)]
+
+
+@pytest.mark.parametrize("text", [
+    '[[[0], Mo, [1]]]',
+    '[[[0], "Mo", [1]], 5]',
+    '[[[0], "Mo"]]',
+    '"Mo"',
+])
+def test_orbital_info_rejects_other_layouts(text):
+    with pytest.raises(ValueError):
+        parser._parse_orbital_info(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('1', 1),
+    ('["e9c46a", 2a9d8f]', ["e9c46a", "2a9d8f"]),
+    ("['#abc', 'red',]", ["#abc", "red"]),
+    ('[]', []),
+    ('viridis', "viridis"),
+])
+def test_color_scheme(text, expected):
+    assert parser._parse_color_scheme(text) == expected
+
+
+def test_color_scheme_rejects_unseparated_colors():
+    with pytest.raises(ValueError):
+        parser._parse_color_scheme('[red green]')
+
+
+def _write_config(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_config_file(tmp_path):
+    path = _write_config(tmp_path / "config.txt", """\
+MODE = Band   # comment after a value
+PROCAR_PATH = PROCAR
+ISPIN = 2
+ORBITAL_INFO = [[[0], "Mo", [4, 5]],
+                [[1, 2], "S", [1, 2, 3]]]
+COLOR_SCHEME = ["e9c46a", red]
+SCALE = 100
+LEGEND_LOC = Best
+SAVEAS = out.png
+""")
+    params = VASPStyleParser(path).as_dict()
+    assert params["MODE"] == "band"
+    assert params["ISPIN"] == 2
+    assert params["ORBITAL_INFO"] == [[[0], "Mo", [4, 5]], [[1, 2], "S", [1, 2, 3]]]
+    assert params["COLOR_SCHEME"] == ["#e9c46a", "#ff0000"]
+    assert params["SCALE"] == 100.0
+    assert params["LEGEND_LOC"] == "best"
+    assert params["TITLE"] == VASPStyleParser.DEFAULTS["TITLE"]
+
+
+def test_soc_forces_ispin_1(tmp_path):
+    path = _write_config(tmp_path / "config.txt", """\
+PROCAR_PATH = PROCAR
+SOC = on
+ISPIN = 2
+ORBITAL_INFO = [[[0], "Bi", [1]]]
+""")
+    params = VASPStyleParser(path).as_dict()
+    assert params["SOC"] is True
+    assert params["ISPIN"] == 1
+
+
+def test_unknown_key(tmp_path):
+    path = _write_config(tmp_path / "config.txt", "PROCAR_PATH = PROCAR\nNOT_A_KEY = 1\n")
+    with pytest.raises(ValueError, match="NOT_A_KEY"):
+        VASPStyleParser(path)
+
+
+def test_edited_config_is_parsed_again(tmp_path):
+    text = 'PROCAR_PATH = PROCAR\nISPIN = 1\nORBITAL_INFO = [[[0], "Si", [0]]]\nTITLE = first\n'
+    path = _write_config(tmp_path / "config.txt", text)
+    assert VASPStyleParser(path).get("TITLE") == "first"
+
+    _write_config(tmp_path / "config.txt", text.replace("first", "second"))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert VASPStyleParser(path).get("TITLE") == "second"
+
+
+def test_params_are_not_shared_between_parses(tmp_path):
+    path = _write_config(tmp_path / "config.txt", 'PROCAR_PATH = PROCAR\nISPIN = 1\nORBITAL_INFO = [[[0], "Si", [0]]]\n')
+    VASPStyleParser(path).as_dict()["ORBITAL_INFO"].append("edited")
+    assert VASPStyleParser(path).as_dict()["ORBITAL_INFO"] == [[[0], "Si", [0]]]
+
+
+@pytest.mark.parametrize("orbital_info", ['[[[-1], "Mo", [4]]]', '[[[0], "Mo", [4, -2]]]'])
+def test_negative_orbital_info_indices(tmp_path, orbital_info):
+    path = _write_config(tmp_path / "config.txt", f"PROCAR_PATH = PROCAR\nORBITAL_INFO = {orbital_info}\n")
+    with pytest.raises(ValueError, match="non-negative"):
+        VASPStyleParser(path)
+
+
+BASE_PARAMS = {"MODE": "band", "PROCAR_PATH": "PROCAR", "ISPIN": 1, "ORBITAL_INFO": [[[0], "Mo", [4]]]}
+
+
+def test_from_dict_parses_values_like_a_config_file(tmp_path):
+    params = VASPStyleParser.from_dict({**BASE_PARAMS, "mode": "Band", "SOC": "on", "SCALE": "100",
+                                        "COLOR_SCHEME": "[e9c46a, red]", "LEGEND_LOC": "Best",
+                                        "TITLE": None}).as_dict()
+    assert params["MODE"] == "band"
+    assert params["SOC"] is True and params["ISPIN"] == 1
+    assert params["SCALE"] == 100.0
+    assert params["COLOR_SCHEME"] == ["#e9c46a", "#ff0000"]
+    assert params["LEGEND_LOC"] == "best"
+    assert params["TITLE"] == VASPStyleParser.DEFAULTS["TITLE"]
+
+    # A parser's own params round-trip unchanged
+    path = _write_config(tmp_path / "config.txt", 'PROCAR_PATH = PROCAR\nISPIN = 2\nORBITAL_INFO = [[[0], "Mo", [4]]]\n'
+                                                   'COLOR_SCHEME = [E9C46A, red]\nSAVEAS = out.jpg\n')
+    expected = VASPStyleParser(path).as_dict()
+    assert VASPStyleParser.from_dict(dict(expected)).as_dict() == expected
+
+
+@pytest.mark.parametrize("override, match", [
+    ({"ORBITAL_INFO": "garbage"}, "ORBITAL_INFO"),
+    ({"ORBITAL_INFO": [[[0], "Mo"]]}, "ORBITAL_INFO"),
+    ({"ORBITAL_INFO": [[[-1], "Mo", [4]]]}, "non-negative"),
+    ({"COLOR_SCHEME": ["notacolor", 5]}, "COLOR_SCHEME"),
+    ({"COLOR_SCHEME": 3}, "COLOR_SCHEME"),
+    ({"COLOR_SCHEME": {"red": 1}}, "COLOR_SCHEME"),
+    ({"MODE": "bands"}, "MODE"),
+    ({"SAVEAS": "out.pdf"}, "SAVEAS"),
+    ({"SHOW_TDOS": "maybe"}, "SHOW_TDOS"),
+    ({"SOC": 2}, "SOC"),
+    ({"ISPIN": 3}, "ISPIN"),
+])
+def test_from_dict_rejects_invalid_values(override, match):
+    with pytest.raises(ValueError, match=match):
+        VASPStyleParser.from_dict({**BASE_PARAMS, **override})
+
+
+def test_from_dict_normalizes_color_lists():
+    params = VASPStyleParser.from_dict({**BASE_PARAMS, "COLOR_SCHEME": ["E9C46A", "#2A9D8F", "red"]}).as_dict()
+    assert params["COLOR_SCHEME"] == ["#e9c46a", "#2a9d8f", "#ff0000"]
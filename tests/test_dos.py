@@ -0,0 +1,234 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:tests/test_dos.py
+
+The DOSCAR readers against a line-by-line float() parse of the same file, on the bundled
+example DOSCARs and on small synthetic ones (SOC layout, no trailing newline), and the DOS
+trace block of plot_pdos against per-orbital sums and per-trace smoothing.
+"""
+import io
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+from scipy.ndimage import gaussian_filter1d
+
+from orbvis.dos import parser, plotter
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+
+# (example, ispin)
+CASES = [("MoS2_ispin1_hse", 1), ("WS2_ispin2_hse", 2), ("Si_ispin1_pbe", 1)]
+
+
+def _doscar(name):
+    return str(EXAMPLES / name / "DOSCAR")
+
+
+def _parse_lines(path):
+    """Fermi energy, total DOS rows and per-atom PDOS rows, converted value by value."""
+    with open(path) as f:
+        lines = f.read().splitlines()
+    natoms = int(lines[0].split()[0])
+    meta = lines[5].split()
+    nedos = int(meta[2])
+    tdos = [[float(v) for v in line.split()] for line in lines[6:6 + nedos]]
+    pdos = []
+    for a in range(natoms):
+        first = 7 + nedos + a * (nedos + 1)
+        pdos.append([[float(v) for v in line.split()] for line in lines[first:first + nedos]])
+    return float(meta[3]), np.array(tdos), np.array(pdos)
+
+
+def _write_doscar(path, natoms, nedos, tdos_cols, pdos_cols, trailing_newline=True, seed=0):
+    # Header, metadata line (Emax, Emin, NEDOS, E-fermi, weight), then the total and per-atom blocks
+    rng = np.random.default_rng(seed)
+    energies = np.linspace(-10, 5, nedos)
+    lines = [f"   {natoms}   {natoms}   1   0", "  0.5E+02  0.3E-09  0.3E-09  0.2E-08  0.5E-15",
+             "  1.0E-004", "  CAR ", " synthetic"]
+    meta = f"      5.00000000    -10.00000000 {nedos}     -1.25000000      1.00000000"
+    lines.append(meta)
+    lines += [f"{e:10.3f}" + "".join(f"  {v:.4E}" for v in rng.random(tdos_cols)) for e in energies]
+    for _ in range(natoms):
+        lines.append(meta)
+        lines += [f"{e:10.3f}" + "".join(f"  {v:.4E}" for v in rng.random(pdos_cols)) for e in energies]
+    Path(path).write_text("\n".join(lines) + ("\n" if trailing_newline else ""))
+    return str(path)
+
+
+@pytest.fixture
+def soc_doscar(tmp_path):
+    # Non-collinear: total DOS and its integral, then total/mx/my/mz for each of s, p, d
+    return _write_doscar(tmp_path / "DOSCAR", natoms=3, nedos=40, tdos_cols=2, pdos_cols=12)
+
+
+@pytest.mark.parametrize("name, ispin", CASES)
+def test_total_dos_matches_line_parse(name, ispin):
+    e_fermi, tdos, _ = _parse_lines(_doscar(name))
+    E, DOS = parser.read_total_dos_streamed(_doscar(name), ispin)
+    np.testing.assert_array_equal(E, tdos[:, 0])
+    np.testing.assert_array_equal(DOS, tdos[:, 1] if ispin == 1 else tdos[:, 1:3])
+    assert parser.read_fermi_energy_streamed(_doscar(name)) == e_fermi
+
+
+@pytest.mark.parametrize("name, ispin", CASES)
+def test_atom_orbital_dos_matches_line_parse(name, ispin):
+    _, _, pdos = _parse_lines(_doscar(name))
+    for atom in range(len(pdos)):
+        for orbital in (0, 2, 8):
+            got = parser.read_atom_orbital_dos_streamed(_doscar(name), ispin, atom, orbital)
+            if ispin == 1:
+                np.testing.assert_array_equal(got, pdos[atom][:, 1 + orbital])
+            else:
+                np.testing.assert_array_equal(got, pdos[atom][:, 1 + 2 * orbital:3 + 2 * orbital])
+
+
+def test_soc_dos_matches_line_parse(soc_doscar):
+    _, tdos, pdos = _parse_lines(soc_doscar)
+    E, DOS = parser.read_total_dos_streamed_soc(soc_doscar)
+    np.testing.assert_array_equal(E, tdos[:, 0])
+    np.testing.assert_array_equal(DOS, tdos[:, 1])
+    for atom in range(len(pdos)):
+        for orbital in range(3):
+            np.testing.assert_array_equal(parser.read_atom_orbital_dos_streamed_soc(soc_doscar, atom, orbital),
+                                          pdos[atom][:, 1 + 4 * orbital])
+
+
+@pytest.mark.parametrize("n", [0, 1, 4])
+def test_skip_advances_n_lines(n):
+    f = io.StringIO("".join(f"line {i}\n" for i in range(6)))
+    parser._skip(f, n)
+    assert next(f) == f"line {n}\n"
+
+
+def test_skip_past_the_end():
+    f = io.StringIO("a\nb\n")
+    parser._skip(f, 5)
+    assert next(f, None) is None
+
+
+@pytest.mark.parametrize("name, ispin", CASES)
+def test_all_pdos_reads_requested_atoms_in_order(name, ispin):
+    _, tdos, pdos = _parse_lines(_doscar(name))
+    for atoms in (None, [2, 0], [1]):
+        E, DOS, got = parser.read_all_pdos_streamed(_doscar(name), ispin, atoms=atoms)
+        expected = pdos if atoms is None else pdos[atoms]
+        np.testing.assert_array_equal(got, expected[..., 1:])
+    np.testing.assert_array_equal(E, tdos[:, 0])
+    np.testing.assert_array_equal(DOS, tdos[:, 1] if ispin == 1 else tdos[:, 1:3])
+
+
+@pytest.mark.parametrize("atoms", [[3], [-1]])
+def test_all_pdos_rejects_atoms_out_of_range(atoms):
+    with pytest.raises(ValueError, match="out of range"):
+        parser.read_all_pdos_streamed(_doscar("MoS2_ispin1_hse"), 1, atoms=atoms)
+
+
+@pytest.mark.parametrize("soc, ispin, pdos_cols", [(True, 1, 12), (False, 2, 18), (False, 1, 9)])
+@pytest.mark.parametrize("trailing_newline", [True, False])
+def test_all_pdos_line_offsets(tmp_path, soc, ispin, pdos_cols, trailing_newline):
+    path = _write_doscar(tmp_path / "DOSCAR", natoms=2, nedos=25, tdos_cols=2 * ispin,
+                         pdos_cols=pdos_cols, trailing_newline=trailing_newline)
+    _, tdos, pdos = _parse_lines(path)
+    E, DOS, got = parser.read_all_pdos_streamed(path, ispin, soc=soc)
+    np.testing.assert_array_equal(E, tdos[:, 0])
+    np.testing.assert_array_equal(DOS, tdos[:, 1] if ispin == 1 else tdos[:, 1:3])
+    np.testing.assert_array_equal(got, pdos[..., 1:])
+
+
+def test_all_pdos_with_windows_line_endings(tmp_path):
+    path = _write_doscar(tmp_path / "DOSCAR", natoms=2, nedos=25, tdos_cols=2, pdos_cols=9)
+    expected = parser.read_all_pdos_streamed(path, 1)
+    Path(path).write_bytes(Path(path).read_bytes().replace(b"\n", b"\r\n"))
+    for got, want in zip(parser.read_all_pdos_streamed(path, 1), expected):
+        np.testing.assert_array_equal(got, want)
+
+
+def _plot_traces(monkeypatch, tmp_path, path, ispin, orbital_info, soc=False, sigma=2.0):
+    """Runs plot_pdos and returns the trace block it smooths and the smoothed result."""
+    calls = []
+
+    def recording_filter(traces, **kwargs):
+        smoothed = gaussian_filter1d(traces, **kwargs)
+        calls.append((traces, smoothed, kwargs))
+        return smoothed
+
+    monkeypatch.setattr(plotter, "gaussian_filter1d", recording_filter)
+    plotter.plot_pdos(DOSCAR_PATH=path, ORBITAL_INFO=orbital_info, ISPIN=ispin, SOC=soc, SIGMA=sigma,
+                      COLOR_SCHEME=0, DPI=20, SAVEAS=str(tmp_path / "pdos.png"))
+    assert len(calls) == 1  # one smoothing call for every trace
+    return calls[0]
+
+
+# Entries with several atoms and orbitals, unsorted atoms, and an atom shared between entries
+ORBITAL_INFO = [[[0], "Mo", [4, 5, 7, 6, 8]], [[2, 1], "S", [1, 2, 3]], [[1], "S", [0]]]
+
+
+@pytest.mark.parametrize("name, ispin", CASES[:2])
+def test_pdos_traces_are_smoothed_in_one_call(monkeypatch, tmp_path, name, ispin):
+    traces, smoothed, kwargs = _plot_traces(monkeypatch, tmp_path, _doscar(name), ispin, ORBITAL_INFO, sigma=3.0)
+    assert kwargs == {"sigma": 3.0, "axis": 1}
+    for trace, got in zip(traces, smoothed):
+        np.testing.assert_array_equal(got, gaussian_filter1d(trace, sigma=3.0, axis=0))
+
+
+def _summed_pdos_loop(path, ispin, orbital_info, soc=False):
+    # One read and one float64 addition per (atom, orbital) pair, as plot_pdos did before the gather
+    sums = []
+    for atom_list, _, orbital_list in orbital_info:
+        total = 0.0
+        for atom in atom_list:
+            for orbital in orbital_list:
+                if soc:
+                    total = total + parser.read_atom_orbital_dos_streamed_soc(path, atom, orbital)
+                else:
+                    total = total + parser.read_atom_orbital_dos_streamed(path, ispin, atom, orbital)
+        sums.append(total)
+    return sums
+
+
+@pytest.mark.parametrize("name, ispin", CASES[:2])
+def test_pdos_group_sums_match_per_orbital_loop(monkeypatch, tmp_path, name, ispin):
+    traces, _, _ = _plot_traces(monkeypatch, tmp_path, _doscar(name), ispin, ORBITAL_INFO)
+    # Summed in float64 and stored as float32, so equal to float32 precision
+    for trace, expected in zip(traces[1:], _summed_pdos_loop(_doscar(name), ispin, ORBITAL_INFO)):
+        np.testing.assert_allclose(trace, expected, rtol=1e-6, atol=0)
+
+
+def test_soc_pdos_group_sums_match_per_orbital_loop(monkeypatch, tmp_path, soc_doscar):
+    orbital_info = [[[0, 2], "Bi", [1, 2]], [[1], "Se", [0]]]
+    traces, _, _ = _plot_traces(monkeypatch, tmp_path, soc_doscar, 1, orbital_info, soc=True)
+    for trace, expected in zip(traces[1:], _summed_pdos_loop(soc_doscar, 1, orbital_info, soc=True)):
+        np.testing.assert_allclose(trace, expected, rtol=1e-6, atol=0)
+
+
+@pytest.mark.parametrize("name, ispin", CASES[:2])
+def test_pdos_traces_are_smoothed_as_float32(monkeypatch, tmp_path, name, ispin):
+    traces, smoothed, _ = _plot_traces(monkeypatch, tmp_path, _doscar(name), ispin, ORBITAL_INFO)
+    assert traces.dtype == smoothed.dtype == np.float32
+    # Within float32 precision of smoothing the float64 traces one by one
+    tdos = parser.read_total_dos_streamed(_doscar(name), ispin)[1]
+    expected = [tdos] + _summed_pdos_loop(_doscar(name), ispin, ORBITAL_INFO)
+    for got, trace in zip(smoothed, expected):
+        reference = gaussian_filter1d(trace, sigma=2.0, axis=0)
+        np.testing.assert_allclose(got, reference, rtol=1e-5, atol=1e-6 * np.abs(reference).max())
+
+
+@pytest.mark.parametrize("name, ispin", CASES[:2])
+def test_pdos_trace_block_layout(monkeypatch, tmp_path, name, ispin):
+    traces, _, _ = _plot_traces(monkeypatch, tmp_path, _doscar(name), ispin, ORBITAL_INFO)
+    _, tdos = parser.read_total_dos_streamed(_doscar(name), ispin)
+    # Row 0 is the TDOS, then one row per ORBITAL_INFO entry, in one contiguous block
+    assert traces.shape == (len(ORBITAL_INFO) + 1,) + tdos.shape
+    assert traces.flags.c_contiguous
+    np.testing.assert_array_equal(traces[0], tdos.astype(np.float32))
@@ -0,0 +1,122 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:tests/test_procar_cache.py
+
+The on-disk cache of parsed PROCAR arrays: reuse, invalidation and pruning.
+"""
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from orbvis.band import parser
+from orbvis.band.parser import read_bands_and_projections_from_PROCAR, read_cached_bands_and_projections
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+PROJECTIONS = [(0, 4), (1, 2), (0, 9)]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setattr(parser, "CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def procar(tmp_path):
+    # A copy, so its mtime can be changed
+    path = tmp_path / "PROCAR"
+    shutil.copy(EXAMPLES / "MoS2_ispin1_hse" / "PROCAR", path)
+    return str(path)
+
+
+def test_cached_read_matches_parse(cache_dir, procar):
+    assert read_cached_bands_and_projections(procar, PROJECTIONS, verbose=False) is None
+    parsed = read_bands_and_projections_from_PROCAR(procar, PROJECTIONS, verbose=False)
+    cached = read_cached_bands_and_projections(procar, PROJECTIONS, verbose=False)
+
+    assert cached is not None
+    for got, expected in zip(cached[:3], parsed[:3]):
+        assert isinstance(got, np.memmap)
+        np.testing.assert_array_equal(got, expected)
+    assert cached[3] == parsed[3]
+
+
+def test_procar_without_tot_column_is_cached(cache_dir, procar):
+    # Only the first ion header is read for the column names
+    text = Path(procar).read_bytes()
+    Path(procar).write_bytes(text.replace(b"x2-y2    tot\n", b"x2-y2\n", 1))
+    parsed = read_bands_and_projections_from_PROCAR(procar, PROJECTIONS, verbose=False)
+    assert parsed[3] is None
+
+    cached = read_cached_bands_and_projections(procar, PROJECTIONS, verbose=False)
+    assert cached is not None and cached[3] is None
+    np.testing.assert_array_equal(cached[2], parsed[2])
+
+
+def test_unreadable_entry_is_written_over(cache_dir, procar):
+    # An entry that cannot be loaded without pickle, as written when a missing 'tot' column was stored as None
+    entry = parser._procar_cache_path(procar, 1, PROJECTIONS, np.float32)
+    os.makedirs(entry)
+    np.save(os.path.join(entry, "tot_index.npy"), np.array(None), allow_pickle=True)
+    assert read_cached_bands_and_projections(procar, PROJECTIONS, verbose=False) is None
+
+    parsed = read_bands_and_projections_from_PROCAR(procar, PROJECTIONS, verbose=False)
+    cached = read_cached_bands_and_projections(procar, PROJECTIONS, verbose=False)
+    assert cached is not None and cached[3] == parsed[3]
+
+
+def test_cache_is_not_used_after_the_file_changes(cache_dir, procar):
+    read_bands_and_projections_from_PROCAR(procar, PROJECTIONS, verbose=False)
+    st = os.stat(procar)
+    os.utime(procar, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert read_cached_bands_and_projections(procar, PROJECTIONS, verbose=False) is None
+
+
+def test_no_cache_writes_nothing(cache_dir, procar):
+    read_bands_and_projections_from_PROCAR(procar, PROJECTIONS, cache=False, verbose=False)
+    assert not cache_dir.exists()
+
+
+def _entry(cache_dir, i):
+    return str(cache_dir / f"{i:016x}")
+
+
+def _save(path):
+    parser._save_cached(path, a=np.zeros(1000))
+    return os.path.join(path, "a.npy")
+
+
+def test_prune_removes_least_recently_used_entries(cache_dir, monkeypatch):
+    entry_size = os.path.getsize(_save(_entry(cache_dir, 0)))
+    shutil.rmtree(_entry(cache_dir, 0))
+    monkeypatch.setattr(parser, "CACHE_MAX_BYTES", 3 * entry_size)
+
+    for i in range(5):
+        _save(_entry(cache_dir, i))
+        os.utime(_entry(cache_dir, i), (i, i))
+    assert sorted(os.listdir(cache_dir)) == [os.path.basename(_entry(cache_dir, i)) for i in (2, 3, 4)]
+
+    # Loading an entry makes it the most recently used one
+    assert parser._load_cached(_entry(cache_dir, 2), ["a"]) is not None
+    _save(_entry(cache_dir, 5))
+    assert sorted(os.listdir(cache_dir)) == [os.path.basename(_entry(cache_dir, i)) for i in (2, 4, 5)]
+
+
+def test_prune_removes_stale_temporary_directories(cache_dir):
+    os.makedirs(cache_dir / "tmp-stale")
+    os.utime(cache_dir / "tmp-stale", (0, 0))
+    os.makedirs(cache_dir / "tmp-writing")
+    (cache_dir / "notes.txt").write_text("not a cache entry")
+
+    _save(_entry(cache_dir, 0))
+    assert sorted(os.listdir(cache_dir)) == [os.path.basename(_entry(cache_dir, 0)), "notes.txt", "tmp-writing"]
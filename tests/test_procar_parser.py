@@ -0,0 +1,129 @@
+# MIT License
+# Copyright (c) 2025 Taradutt Pattnaik
+# See LICENSE file for full license information.
+"""
+OrbVis
+
+Orbital-projected band structure plotting for VASP PROCAR data.
+
+File name:tests/test_procar_parser.py
+
+The numba PROCAR kernel (run as plain Python when numba is not installed) against the
+pure-Python fallback scan, on the bundled example PROCARs.
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from orbvis.band import parser, parser_numba
+from orbvis.band.parser import ProcarReader
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "examples"
+
+# (example, ispin); the SOC PROCAR is scanned like ISPIN=1
+CASES = [("MoS2_ispin1_hse", 1), ("WS2_ispin2_hse", 2), ("Bi2Se3_SOC", 1)]
+
+# Sorted by ion, then column, as ProcarReader.read_projections passes them. Column 12 and ion 7
+# are outside every ion table and must read as zeros
+PROJ_IONS = np.array([0, 0, 0, 0, 1, 2, 2, 7])
+PROJ_COLS = np.array([1, 3, 10, 12, 4, 7, 9, 1])
+
+
+def _scan(scan, name, ispin, **kwargs):
+    with ProcarReader(EXAMPLES / name / "PROCAR") as procar:
+        return scan(procar, ispin, PROJ_IONS, PROJ_COLS, np.float64, **kwargs)
+
+
+def _assert_same_scan(got, expected):
+    band_energies, klist, band_data = got
+    np.testing.assert_array_equal(band_energies, expected[0])
+    np.testing.assert_array_equal(klist, expected[1])
+    np.testing.assert_array_equal(band_data, expected[2])
+
+
+@pytest.mark.parametrize("name, ispin", CASES)
+def test_numba_kernel_matches_python_fallback(name, ispin):
+    expected = _scan(parser._scan_procar_python, name, ispin)
+    _assert_same_scan(_scan(parser_numba.scan_procar_jit, name, ispin, workers=1), expected)
+
+
+@pytest.mark.parametrize("name, ispin", CASES)
+def test_threaded_numba_scan_matches_python_fallback(monkeypatch, name, ispin):
+    # Every file is split on k-point headers and the ranges are parsed on several threads
+    monkeypatch.setattr(parser_numba, "PARALLEL_MIN_BYTES", 0)
+    with ProcarReader(EXAMPLES / name / "PROCAR") as procar:
+        assert len(parser_numba._kpoint_chunks(procar.mm, procar.data_start, ispin, 4)) > 1
+
+    expected = _scan(parser._scan_procar_python, name, ispin)
+    _assert_same_scan(_scan(parser_numba.scan_procar_jit, name, ispin, workers=4), expected)
+
+
+@pytest.mark.parametrize("name, ispin", CASES)
+def test_regex_sweeps_match_scan(name, ispin):
+    band_energies, klist, _ = _scan(parser._scan_procar_python, name, ispin)
+    with ProcarReader(EXAMPLES / name / "PROCAR") as procar:
+        swept_energies, swept_klist = procar.read_energies_klist(ispin, np.float64)
+        np.testing.assert_array_equal(procar.read_klist(), klist)
+    np.testing.assert_array_equal(swept_klist, klist)
+    np.testing.assert_array_equal(swept_energies, band_energies[0] if ispin == 1 else band_energies)
+
+
+def test_read_projections_restores_caller_order():
+    path = EXAMPLES / "WS2_ispin2_hse" / "PROCAR"
+    projections = [(2, 8), (0, 0), (2, 8), (1, 3)]
+    with ProcarReader(path) as procar:
+        _, _, band_data = procar.read_projections(projections, 2, np.float64)
+        for i, (ion, orbital) in enumerate(projections):
+            _, _, single = procar.read_projections([(ion, orbital)], 2, np.float64)
+            np.testing.assert_array_equal(band_data[i], single[0])
+
+
+@pytest.mark.parametrize("scan", [parser._scan_procar_python, parser_numba.scan_procar_jit])
+@pytest.mark.parametrize("min_bytes", [0, parser_numba.PARALLEL_MIN_BYTES])
+def test_more_bands_than_declared_is_rejected(tmp_path, monkeypatch, scan, min_bytes):
+    # Every k-point lists 16 bands but the header declares 8: stop with an error instead of
+    # writing past the arrays
+    monkeypatch.setattr(parser_numba, "PARALLEL_MIN_BYTES", min_bytes)
+    text = (EXAMPLES / "MoS2_ispin1_hse" / "PROCAR").read_bytes()
+    path = tmp_path / "PROCAR"
+    path.write_bytes(text.replace(b"# of bands:   16", b"# of bands:    8", 1))
+    with ProcarReader(path) as procar:
+        assert procar.num_band == 8
+        kwargs = {"workers": 4} if scan is parser_numba.scan_procar_jit else {}
+        with pytest.raises(ValueError, match="more bands or k-points"):
+            scan(procar, 1, PROJ_IONS, PROJ_COLS, np.float64, **kwargs)
+
+
+@pytest.mark.parametrize("scan", [parser._scan_procar_python, parser_numba.scan_procar_jit])
+def test_truncated_procar_leaves_missing_bands_at_zero(tmp_path, scan):
+    text = (EXAMPLES / "MoS2_ispin1_hse" / "PROCAR").read_bytes()
+    path = tmp_path / "PROCAR"
+    truncated = text[:text.rfind(b"\n k-point", 0, 60_000) + 1]
+    path.write_bytes(truncated)
+    with ProcarReader(path) as procar:
+        band_energies, _, band_data = scan(procar, 1, PROJ_IONS, PROJ_COLS, np.float64)
+    full_energies, _, full_data = _scan(parser._scan_procar_python, "MoS2_ispin1_hse", 1)
+
+    n_read = truncated.count(b" k-point ")
+    assert 0 < n_read < band_energies.shape[-1]
+    np.testing.assert_array_equal(band_energies[..., :n_read], full_energies[..., :n_read])
+    np.testing.assert_array_equal(band_data[..., :n_read], full_data[..., :n_read])
+    assert not band_energies[..., n_read:].any()
+    assert not band_data[..., n_read:].any()
+
+
+def test_read_projections_rejects_negative_indices():
+    with ProcarReader(EXAMPLES / "MoS2_ispin1_hse" / "PROCAR") as procar:
+        for projections in ([(-1, 0)], [(0, -1)]):
+            with pytest.raises(ValueError, match="non-negative"):
+                procar.read_projections(projections)
+
+
+def test_python_scan_reads_negative_slots_as_zero():
+    # Ion -1 and column 0 (the ion number) are outside the table, like ion 7 and column 12
+    with ProcarReader(EXAMPLES / "MoS2_ispin1_hse" / "PROCAR") as procar:
+        _, _, band_data = parser._scan_procar_python(procar, 1, np.array([-1, 0, 0]), np.array([1, 0, 1]),
+                                                     np.float64)
+    assert not band_data[:2].any()
+    assert band_data[2].any()